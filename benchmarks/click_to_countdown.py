@@ -0,0 +1,60 @@
+""" Time from the click on the '15 sec' button to the first countdown
+tick, under the offscreen Qt platform. The click handler runs before the
+event loop gets control back, so its time is reported on its own, the
+rest is the wait for the countdown timer.
+Run from the repository root: python -m benchmarks.click_to_countdown """
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+import src.main_window as main_window
+from src.text_generating import text_pool
+
+clicks = 20
+
+
+def spin(msecs: int) -> None:
+    """ Runs the event loop for the given time """
+    loop = QEventLoop()
+    QTimer.singleShot(msecs, loop.quit)
+    loop.exec()
+
+
+def main() -> None:
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as directory:
+        main_window.history_file = os.path.join(directory, 'history.db')
+        window = main_window.MainWindow()
+        window.show()
+        text_pool.refill().result() # the corpus is open, the pool full
+        loop = QEventLoop()
+        ticks = []
+        window.scheduler.countdown_tick.connect(
+            lambda seconds: ticks.append(time.perf_counter()) or loop.quit())
+        handler, first_tick = [], []
+        for _ in range(clicks):
+            ticks.clear()
+            start = time.perf_counter()
+            window.button15.click()
+            handler.append(time.perf_counter() - start)
+            loop.exec()
+            first_tick.append(ticks[0] - start)
+            window.back_from_pause()
+            text_pool.refill().result()
+            spin(50)
+        window.close()
+    print(clicks, "clicks, median")
+    print("  click handler             {:8.2f} ms".format(
+        statistics.median(handler) * 1000))
+    print("  click to first tick       {:8.2f} ms".format(
+        statistics.median(first_tick) * 1000))
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+""" Inserts 1M synthetic attempts made over a year into a history store
+in a temporary directory and times its queries.
+Run from the repository root: python -m benchmarks.history_store """
+import os
+import random
+import statistics
+import tempfile
+import time
+import src.history_store as history_store
+from src.history_store import HistoryStore, insert_attempts, day
+
+attempts = 1000000
+batch = 10000 # attempts per transaction
+modes = (('time', 15, None), ('time', 30, None), ('time', 60, None),
+         ('task', 45, 40), ('drill', 60, None))
+
+
+def synthetic_rows(now: int) -> list:
+    """ Returns the attempts of the last year in chronological order """
+    generator = random.Random(1)
+    start = now - 365 * day
+    rows = []
+    for number in range(attempts):
+        mode, time_limit, speed_goal = generator.choice(modes)
+        wpm = max(generator.gauss(45 + 20 * number / attempts, 8), 0)
+        accuracy = min(generator.gauss(95, 3), 100)
+        rows.append((start + number * 365 * day // attempts, mode,
+                     time_limit, speed_goal, round(wpm, 2),
+                     round(accuracy, 2), generator.randrange(10)))
+    return rows
+
+
+def timed(function, repeat: int = 5) -> float:
+    """ Returns the median milliseconds of the call """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    now = int(time.time())
+    rows = synthetic_rows(now)
+    with tempfile.TemporaryDirectory() as directory:
+        history_store.legacy_attempts_log = os.path.join(directory, 'none')
+        history_store.legacy_attempts_file = os.path.join(directory, 'none')
+        path = os.path.join(directory, 'history.db')
+        store = HistoryStore(path)
+        start = time.perf_counter()
+        for first in range(0, attempts, batch):
+            insert_attempts(store.connection, rows[first:first + batch])
+        insert = time.perf_counter() - start
+        one = timed(lambda: insert_attempts(store.connection, rows[:1]), 200)
+        store.close()
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        store = HistoryStore(path)
+        rebuild = time.perf_counter() - start
+        store.close()
+        open_time = timed(lambda: HistoryStore(path).close())
+        store = HistoryStore(path)
+        results = (
+            ("open, schema + sampled ANALYZE", open_time),
+            ("last 10 attempts", timed(lambda: store.last_attempts(10))),
+            ("7-day average per mode", timed(store.week_average)),
+            ("30-day accuracy trend, 60 sec",
+             timed(lambda: store.accuracy_trend('time', 60, now - 30 * day))),
+            ("best wpm per mode", timed(store.best_per_mode)),
+            ("table page by wpm, offset 500k",
+             timed(lambda: store.attempts_page(None, 'wpm', True, 500000,
+                                               100))),
+            ("chart series, 60 sec", timed(
+                lambda: store.attempt_series(('time', 60)), 1)))
+        store.close()
+    print(attempts, "attempts")
+    print("  {:40} {:9.0f} ms, {:.0f} MB".format(
+        "insert, " + str(batch) + " per transaction", insert * 1000,
+        size / 2 ** 20))
+    print("  {:40} {:9.3f} ms".format("one attempt, own transaction", one))
+    print("  {:40} {:9.0f} ms".format("first open, summary rebuilt",
+                                     rebuild * 1000))
+    for name, value in results:
+        print("  {:40} {:9.3f} ms".format(name, value))
+
+
+if __name__ == '__main__':
+    main()
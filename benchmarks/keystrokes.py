@@ -0,0 +1,82 @@
+""" Keystroke handling time of MainWindow under the offscreen Qt platform,
+with the current palette switching and with the style sheet set on every
+keystroke as keyPressEvent did before.
+Run from the repository root: python -m benchmarks.keystrokes """
+import os
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import Qt, QEvent
+from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtWidgets import QApplication
+import src.main_window as main_window
+from src.text_generating import load_corpus
+
+keystrokes = 3000
+mistake_every = 10 # keys, for the run with mistakes
+normal_style = "color: rgb(150, 150, 150)"
+mistake_style = "color: rgb(150, 150, 150); background-color: rgb(220, 85, 85)"
+
+
+def key_event(char: str) -> QKeyEvent:
+    """ Returns the press of the key typing the character """
+    return QKeyEvent(QEvent.Type.KeyPress, 0, Qt.KeyboardModifier.NoModifier,
+                     char)
+
+
+def start_attempt(window: main_window.MainWindow) -> None:
+    """ Starts a 60 sec attempt and skips the countdown """
+    window.button60.click()
+    window.scheduler.countdown_timer.stop()
+    while not window.is_launched:
+        window.scheduler.update_countdown()
+
+
+def type_keys(window: main_window.MainWindow, with_mistakes: bool,
+              with_style_sheets: bool) -> float:
+    """ Returns the seconds per handled keystroke, a paint included """
+    app = QApplication.instance()
+    label = window.label_str2
+    elapsed = 0.0
+    for number in range(keystrokes):
+        session = window.session
+        is_mistake = with_mistakes and number % mistake_every == 0
+        event = key_event('#' if is_mistake else session.text[session.cursor])
+        start = time.perf_counter()
+        window.keyPressEvent(event)
+        if with_style_sheets:
+            label.setStyleSheet(mistake_style if session.is_mistake
+                                else normal_style)
+        app.processEvents()
+        elapsed += time.perf_counter() - start
+    return elapsed / keystrokes
+
+
+def main() -> None:
+    app = QApplication([])
+    load_corpus()
+    with tempfile.TemporaryDirectory() as directory:
+        main_window.history_file = os.path.join(directory, 'history.db')
+        window = main_window.MainWindow()
+        window.show()
+        print(keystrokes, "keys, one mistake per", mistake_every,
+              "keys in the runs with mistakes")
+        for with_style_sheets in (True, False):
+            for with_mistakes in (False, True):
+                start_attempt(window)
+                spent = type_keys(window, with_mistakes, with_style_sheets)
+                window.back_from_pause()
+                window.label_str2.setStyleSheet("")
+                print("  {:22} {:14} {:6.1f} us/key".format(
+                    "style sheet per key" if with_style_sheets
+                    else "palette on change",
+                    "with mistakes" if with_mistakes else "correct keys",
+                    spent * 1e6))
+        window.close()
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
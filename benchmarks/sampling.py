@@ -0,0 +1,49 @@
+""" Draws per second of the word samplers. The shipped word list has no
+frequencies, so the weighted samplers get Zipf weights, 1 / rank.
+Run from the repository root: python -m benchmarks.sampling """
+import random
+import time
+from itertools import accumulate
+from src.alias_table import AliasTable
+from src.corpus import open_corpus
+
+draws = 1000000
+
+
+def rate(draw, count: int = draws) -> float:
+    """ Returns the draws per second of the function """
+    start = time.perf_counter()
+    for _ in range(count):
+        draw()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    corpus = open_corpus()
+    words = [corpus[index] for index in range(len(corpus))]
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    random.shuffle(weights)
+    cumulative = list(accumulate(weights))
+    indices = range(len(words))
+
+    start = time.perf_counter()
+    alias_table = AliasTable.from_weights(weights)
+    build = time.perf_counter() - start
+
+    results = (
+        ("random.choice(list), unweighted",
+         rate(lambda: random.choice(words))),
+        ("random.choices(cum_weights=...), O(log n)",
+         rate(lambda: random.choices(indices, cum_weights=cumulative))),
+        ("AliasTable.draw, O(1)", rate(alias_table.draw)),
+        ("corpus[corpus.random_index()], decoded",
+         rate(lambda: corpus[corpus.random_index()])))
+    print(len(words), "words,", draws, "draws each")
+    for name, value in results:
+        print("  {:45} {:6.2f} M/s".format(name, value / 1e6))
+    print("  alias table built in {:.0f} ms".format(build * 1000))
+    corpus.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+""" Synthetic correct keystrokes through the old string slicing path and
+through TypingSession, with the typed and upcoming text taken after every
+keystroke as the typing labels do.
+Run from the repository root: python -m benchmarks.typing_session """
+import time
+from src.typing_session import TypingSession
+from src.text_generating import text_stream
+
+keystrokes = 100000
+text_sizes = (keystrokes + 1000, 10 * keystrokes) # of the old path
+
+
+def old_path(text: str) -> float:
+    """ Returns the seconds per keystroke of the slicing of the strings
+    done by keyPressEvent before the cursor """
+    string1, string2 = '', text
+    start = time.perf_counter()
+    for _ in range(keystrokes):
+        string1 += string2[0]
+        string2 = string2[1:]
+        string1[-100:], string2[:300]
+    return (time.perf_counter() - start) / keystrokes
+
+
+def new_path() -> tuple:
+    """ Returns the seconds per keystroke of TypingSession reading
+    the text stream and the size of its text at the end """
+    session = TypingSession(text_stream())
+    session.fill()
+    start = time.perf_counter()
+    for _ in range(keystrokes):
+        session.press(session.text[session.cursor])
+        session.typed(), session.upcoming()
+    return (time.perf_counter() - start) / keystrokes, len(session.text)
+
+
+def main() -> None:
+    stream = text_stream()
+    text = ''
+    print(keystrokes, "keystrokes")
+    for size in text_sizes:
+        while len(text) < size:
+            text += next(stream)
+        print("  old, slicing      {:6.2f} us/key, {} chars of text"
+              .format(old_path(text[:size]) * 1e6, size))
+    new, size = new_path()
+    print("  TypingSession     {:6.2f} us/key, text ends {} chars"
+          .format(new * 1e6, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import random
+from array import array
+
+
+def build_alias_table(weights) -> tuple:
+    """ Builds the probability and alias columns of Vose's alias method
+    for the given non-negative weights """
+    size = len(weights)
+    total = sum(weights)
+    if size == 0 or total <= 0:
+        raise ValueError("weights must contain a positive value")
+    scaled = [weight * size / total for weight in weights]
+    small = [index for index, value in enumerate(scaled) if value < 1]
+    large = [index for index, value in enumerate(scaled) if value >= 1]
+    probability = array('d', bytes(8 * size))
+    alias = array('I', bytes(4 * size))
+
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] += scaled[less] - 1
+        if scaled[more] < 1:
+            small.append(more)
+        else:
+            large.append(more)
+    # whatever is left is 1 up to rounding errors
+    for index in large + small:
+        probability[index] = 1
+        alias[index] = index
+    return probability, alias
+
+
+class AliasTable:
+    """ Draws indices with the given weights in O(1) per draw """
+
+    def __init__(self, probability, alias) -> None:
+        self.probability = probability
+        self.alias = alias
+        self.size = len(probability)
+
+    @classmethod
+    def from_weights(cls, weights) -> 'AliasTable':
+        """ Builds the table from scratch """
+        return cls(*build_alias_table(weights))
+
+    def draw(self, rand=random.random) -> int:
+        """ Returns a random index, one uniform number per draw:
+    its integer part picks the column, the fraction the side """
+        value = rand() * self.size
+        index = int(value)
+        if index == self.size: # rand() * size may round up to size
+            index -= 1
+        if value - index < self.probability[index]:
+            return index
+        return self.alias[index]
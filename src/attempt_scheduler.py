@@ -0,0 +1,86 @@
+from PyQt6.QtCore import Qt, QObject, QTimer, QElapsedTimer, pyqtSignal
+from src.globals import seconds_left, mil_per_sec, clock_refresh
+
+
+class AttemptScheduler(QObject):
+    """ Owns the timers of the attempts for the whole life of the window:
+    the countdown, the clock refresh and the deadline. The time of the
+    attempt is measured by a monotonic clock, pauses excluded """
+
+    countdown_tick = pyqtSignal(int) # seconds left in the countdown
+    started = pyqtSignal() # the countdown is over, the user may type
+    refresh = pyqtSignal() # time to repaint the clock
+    deadline = pyqtSignal() # the time limit has run out
+
+    def __init__(self, parent: QObject) -> None:
+        super().__init__(parent)
+        self.countdown_timer = QTimer(self)
+        self.countdown_timer.setInterval(mil_per_sec)
+        self.countdown_timer.timeout.connect(self.update_countdown)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(clock_refresh)
+        self.refresh_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.deadline_timer = QTimer(self)
+        self.deadline_timer.setSingleShot(True)
+        self.deadline_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.deadline_timer.timeout.connect(self.reach_deadline)
+        self.elapsed_timer = QElapsedTimer()
+        self.elapsed_before = 0 # milliseconds typed before the last pause
+        self.time_limit = 0 # milliseconds
+        self.seconds_left = 0
+        self.is_running = False
+
+    def start(self, time_limit: int) -> None:
+        """ Starts a new attempt with the time limit in milliseconds,
+    beginning with the countdown """
+        self.cancel()
+        self.elapsed_before = 0
+        self.time_limit = time_limit
+        self.begin_countdown()
+
+    def pause(self) -> None:
+        """ Stops the clock, the time typed so far is kept """
+        self.elapsed_before = self.elapsed_msecs()
+        self.cancel()
+
+    def resume(self) -> None:
+        """ Continues the attempt after a new countdown """
+        self.cancel()
+        self.begin_countdown()
+
+    def cancel(self) -> None:
+        """ Stops every timer """
+        self.countdown_timer.stop()
+        self.refresh_timer.stop()
+        self.deadline_timer.stop()
+        self.is_running = False
+
+    def elapsed_msecs(self) -> int:
+        """ Returns the time of the attempt in milliseconds """
+        if not self.is_running:
+            return self.elapsed_before
+        return self.elapsed_before + self.elapsed_timer.elapsed()
+
+    def begin_countdown(self) -> None:
+        """ Starts counting down the seconds before typing """
+        self.seconds_left = seconds_left
+        self.countdown_timer.start()
+
+    def update_countdown(self) -> None:
+        """ Reports the seconds left and starts the clock at the end """
+        self.countdown_tick.emit(self.seconds_left)
+        self.seconds_left -= 1
+        if self.seconds_left == -1:
+            self.countdown_timer.stop()
+            self.elapsed_timer.start()
+            self.refresh_timer.start()
+            self.deadline_timer.start(max(
+                self.time_limit - self.elapsed_before, 0))
+            self.is_running = True
+            self.started.emit()
+
+    def reach_deadline(self) -> None:
+        """ Stops the clock when the time limit runs out """
+        self.pause()
+        self.deadline.emit()
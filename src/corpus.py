@@ -0,0 +1,381 @@
+import mmap
+import os
+import random
+import struct
+from array import array
+from bisect import bisect_left
+import numpy as np
+from src.alias_table import AliasTable, build_alias_table
+from src.key_stats import char_slot, slot_count
+from src.globals import corpus_source, corpus_compiled, russian_letters
+
+# Compiled corpus layout: a header, a table of named sections and the
+# sections themselves, each aligned to 8 bytes. Arrays are stored in the
+# native byte order: the compiled file is a local cache, not an exchange format
+corpus_magic = b'KTWC'
+corpus_version = 5
+letter_bits = {letter: 1 << bit for bit, letter in enumerate(russian_letters)}
+other_bit = 1 << len(russian_letters) # any character that is not a letter
+header_format = struct.Struct('<4sHHI') # magic, version, sections, words
+section_format = struct.Struct('<4sQQ') # name, offset, size
+
+
+def read_words(source: str) -> tuple:
+    """ Reads the word list sorted by code points. A line holds a word
+    and optionally its frequency separated by a tab; duplicates have
+    their frequencies summed. Returns the words and their frequencies,
+    or None instead of the frequencies if the list has none """
+    frequencies = {}
+    weighted = False
+    with open(source, 'r', encoding='utf-8') as file:
+        for line in file:
+            word, _, frequency = line.strip().partition('\t')
+            if not word:
+                continue
+            if frequency:
+                weighted = True
+            frequencies[word] = (frequencies.get(word, 0)
+                                 + float(frequency or 1))
+    words = sorted(frequencies)
+    if not weighted:
+        return words, None
+    return words, [frequencies[word] for word in words]
+
+
+def letter_mask(word: str) -> int:
+    """ Returns the set of letters of the word as a bit mask. Capitals
+    need Shift, so like any other character they set other_bit """
+    mask = 0
+    for char in word:
+        mask |= letter_bits.get(char, other_bit)
+    return mask
+
+
+def letters_mask(letters: str) -> int:
+    """ Returns the mask of the letters the user may type. 'е' allows
+    'ё' too, since it is accepted in its place while typing """
+    mask = 0
+    for char in letters.lower():
+        mask |= letter_bits.get(char, 0)
+    if mask & letter_bits['е']:
+        mask |= letter_bits['ё']
+    return mask
+
+
+def build_mask_index(masks: list) -> dict:
+    """ Groups the word indices by mask: the distinct masks in ascending
+    order, the bounds of every group and the indices themselves """
+    order = sorted(range(len(masks)), key=masks.__getitem__)
+    keys = array('Q')
+    bounds = array('I')
+    for position, index in enumerate(order):
+        if not keys or keys[-1] != masks[index]:
+            keys.append(masks[index])
+            bounds.append(position)
+    bounds.append(len(order))
+    return {b'MKEY': keys.tobytes(), b'MBND': bounds.tobytes(),
+            b'MIDX': array('I', order).tobytes()}
+
+
+def build_length_index(words: list) -> dict:
+    """ Groups the word indices by length into buckets, indices stay
+    in ascending order inside a bucket """
+    lengths = [min(len(word), 255) for word in words]
+    order = sorted(range(len(words)), key=lengths.__getitem__)
+    bounds = array('I', [0] * (max(lengths, default=0) + 2))
+    for length in lengths:
+        bounds[length + 1] += 1
+    for length in range(1, len(bounds)):
+        bounds[length] += bounds[length - 1]
+    return {b'LENG': array('B', lengths).tobytes(), b'LBND': bounds.tobytes(),
+            b'LIDX': array('I', order).tobytes()}
+
+
+def word_bigrams(word: str) -> list:
+    """ Returns the distinct bigram slots typed with the word, the spaces
+    around it included, in ascending order """
+    slots = [char_slot(char) for char in ' ' + word + ' ']
+    return sorted({first * slot_count + second
+                   for first, second in zip(slots, slots[1:])})
+
+
+def build_bigram_index(words: list) -> dict:
+    """ Sparse index between the words and their bigrams in both
+    directions: the bigrams of every word and the words of every bigram,
+    each as offsets into a flat array """
+    word_offsets = array('I', [0])
+    bigrams = array('H')
+    for word in words:
+        bigrams.extend(word_bigrams(word))
+        word_offsets.append(len(bigrams))
+    # the words of every bigram are the word of every entry, sorted
+    # by bigram; a stable sort keeps the words in ascending order
+    owners = np.repeat(np.arange(len(words), dtype=np.uint32),
+                       np.diff(np.frombuffer(word_offsets, dtype=np.uint32)))
+    order = np.argsort(np.frombuffer(bigrams, dtype=np.uint16),
+                       kind='stable')
+    bigram_offsets = np.searchsorted(
+        np.frombuffer(bigrams, dtype=np.uint16)[order],
+        np.arange(slot_count ** 2 + 1)).astype(np.uint32)
+    return {b'BOFF': word_offsets.tobytes(), b'BIDX': bigrams.tobytes(),
+            b'WOFF': bigram_offsets.tobytes(),
+            b'WIDX': owners[order].tobytes()}
+
+
+def build_sections(words: list, frequencies: list = None) -> dict:
+    """ Packs the words into the sections of the compiled corpus.
+    Frequencies add the weights and their alias table """
+    encoded = [word.encode('utf-8') for word in words]
+    offsets = array('I', [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    masks = [letter_mask(word) for word in words]
+    sections = {b'OFFS': offsets.tobytes(), b'TEXT': b''.join(encoded),
+                b'MASK': array('Q', masks).tobytes()}
+    sections.update(build_mask_index(masks))
+    sections.update(build_length_index(words))
+    sections.update(build_bigram_index(words))
+    if frequencies is not None:
+        probability, alias = build_alias_table(frequencies)
+        sections[b'FREQ'] = array('d', frequencies).tobytes()
+        sections[b'APRB'] = probability.tobytes()
+        sections[b'AIDX'] = alias.tobytes()
+    return sections
+
+
+def align(position: int) -> int:
+    """ Rounds the position up to the section alignment """
+    return (position + 7) & ~7
+
+
+def compile_corpus(source: str = corpus_source,
+                   target: str = corpus_compiled) -> None:
+    """ Compiles the word list into a single file that can be mapped
+    into memory """
+    words, frequencies = read_words(source)
+    sections = build_sections(words, frequencies)
+    table = []
+    position = align(header_format.size
+                     + section_format.size * len(sections))
+    for name, data in sections.items():
+        table.append((name, position, len(data)))
+        position = align(position + len(data))
+
+    temp_path = target + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(header_format.pack(corpus_magic, corpus_version,
+                                      len(sections), len(words)))
+        for entry in table:
+            file.write(section_format.pack(*entry))
+        for (name, offset, size), data in zip(table, sections.values()):
+            file.write(b'\0' * (offset - file.tell()))
+            file.write(data)
+    os.replace(temp_path, target)
+
+
+class WordPool:
+    """ Indices of the corpus words a text is drawn from """
+
+    def __init__(self, indices, alias_table: AliasTable = None) -> None:
+        self.indices = indices
+        self.alias_table = alias_table
+
+    @classmethod
+    def from_corpus(cls, corpus: 'Corpus', indices) -> 'WordPool':
+        """ Makes a pool of the words, weighted like in the corpus """
+        if corpus.weights is None or not indices:
+            return cls(indices)
+        weights = [corpus.weights[index] for index in indices]
+        return cls(indices, AliasTable.from_weights(weights))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def draw(self) -> int:
+        """ Draws the corpus index of a word from the pool """
+        if self.alias_table is None:
+            return self.indices[random.randrange(len(self.indices))]
+        return self.indices[self.alias_table.draw()]
+
+
+class Corpus:
+    """ Read-only view of the compiled corpus. Words are decoded one by one
+    straight from the mapped file, nothing is loaded up front """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        try:
+            magic, version, count, self._size = header_format.unpack_from(
+                self._map)
+        except struct.error:
+            magic, version, count = b'', 0, 0
+        if magic != corpus_magic or version != corpus_version:
+            self.close()
+            raise ValueError("unsupported corpus file: " + path)
+
+        self.sections = {}
+        self._casts = []
+        for index in range(count):
+            name, offset, size = section_format.unpack_from(
+                self._map, header_format.size + index * section_format.size)
+            self.sections[name] = self._view[offset:offset + size]
+        self._offsets = self.section(b'OFFS', 'I')
+        self._text = self.sections[b'TEXT']
+        self.weights = None
+        self.alias_table = None
+        if b'FREQ' in self.sections:
+            self.weights = self.section(b'FREQ', 'd')
+            self.alias_table = AliasTable(self.section(b'APRB', 'd'),
+                                          self.section(b'AIDX', 'I'))
+        self.masks = self.section(b'MASK', 'Q')
+        self._mask_keys = self.section(b'MKEY', 'Q')
+        self._mask_bounds = self.section(b'MBND', 'I')
+        self._mask_index = self.sections[b'MIDX'] # raw bytes, 4 per index
+        self.pool = WordPool(range(self._size), self.alias_table)
+        self._letter_pools = {}
+        self.lengths = self.section(b'LENG', 'B')
+        self._length_bounds = self.section(b'LBND', 'I')
+        self._length_index = self.section(b'LIDX', 'I')
+        self._pools = {}
+
+    def section(self, name: bytes, typecode: str) -> memoryview:
+        """ Returns the section as an array of the given type, no copy """
+        view = self.sections[name].cast(typecode)
+        self._casts.append(view)
+        return view
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("corpus index out of range")
+        return str(self._text[self._offsets[index]:self._offsets[index + 1]],
+                   'utf-8')
+
+    def random_index(self) -> int:
+        """ Draws a word index, weighted by frequency if the corpus has it """
+        return self.pool.draw()
+
+    def matching_masks(self, allowed: int):
+        """ Yields the positions of the distinct masks that are subsets
+    of the allowed mask. Small sets enumerate their own subsets,
+    large ones are checked against every distinct mask """
+        keys = self._mask_keys
+        if (1 << bin(allowed).count('1')) * 4 < len(keys):
+            subset = allowed
+            while True:
+                position = bisect_left(keys, subset)
+                if position < len(keys) and keys[position] == subset:
+                    yield position
+                if subset == 0:
+                    return
+                subset = (subset - 1) & allowed
+        else:
+            forbidden = ~allowed
+            for position, key in enumerate(keys):
+                if not key & forbidden:
+                    yield position
+
+    def letter_set_pool(self, letters: str) -> WordPool:
+        """ Returns the pool of words made only of the given letters,
+    the pools are cached per letter set """
+        allowed = letters_mask(letters)
+        if allowed not in self._letter_pools:
+            indices = array('I')
+            bounds = self._mask_bounds
+            for position in self.matching_masks(allowed):
+                indices.frombytes(self._mask_index[
+                    4 * bounds[position]:4 * bounds[position + 1]])
+            self._letter_pools[allowed] = WordPool.from_corpus(
+                self, array('I', sorted(indices)))
+        return self._letter_pools[allowed]
+
+    def prefix_range(self, prefix: str) -> tuple:
+        """ Returns the bounds of the words starting with the prefix,
+    found by bisection over the sorted words """
+        if not prefix:
+            return 0, self._size
+        following = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return bisect_left(self, prefix), bisect_left(self, following)
+
+    def length_range(self, min_len: int = None, max_len: int = None) -> range:
+        """ Returns the lengths present in the corpus within the limits """
+        longest = len(self._length_bounds) - 2
+        if max_len is not None:
+            longest = min(longest, max_len)
+        return range(max(min_len or 0, 0), longest + 1)
+
+    def query(self, letters: str = None, prefix: str = None,
+              min_len: int = None, max_len: int = None) -> WordPool:
+        """ Returns the pool of words matching all the given filters,
+    the pools are cached per set of filters """
+        key = (letters_mask(letters) if letters is not None else None,
+               prefix or None, min_len, max_len)
+        if key == (None, None, None, None):
+            return self.pool
+        if key not in self._pools:
+            self._pools[key] = WordPool.from_corpus(
+                self, self.find_indices(letters, prefix, min_len, max_len))
+        return self._pools[key]
+
+    def find_indices(self, letters: str, prefix: str,
+                     min_len: int, max_len: int):
+        """ Collects the indices of the words matching the filters.
+    The prefix gives a range of indices; inside a letter set pool or
+    a length bucket the indices are sorted, so the range is cut out
+    of them by bisection """
+        start, end = self.prefix_range(prefix)
+        lengths = self.length_range(min_len, max_len)
+        if letters is not None:
+            pool = self.letter_set_pool(letters).indices
+            indices = pool[bisect_left(pool, start):bisect_left(pool, end)]
+            if min_len is None and max_len is None:
+                return indices
+            return array('I', [index for index in indices
+                               if self.lengths[index] in lengths])
+        if min_len is None and max_len is None:
+            return range(start, end)
+
+        indices = array('I')
+        raw_index = self.sections[b'LIDX'] # raw bytes, 4 per index
+        for length in lengths:
+            first = self._length_bounds[length]
+            bucket = self._length_index[first:self._length_bounds[length + 1]]
+            low = first + bisect_left(bucket, start)
+            high = first + bisect_left(bucket, end)
+            bucket.release()
+            indices.frombytes(raw_index[4 * low:4 * high])
+        return indices
+
+    def close(self) -> None:
+        """ Releases the views and unmaps the file """
+        views = getattr(self, '_casts', [])
+        views += getattr(self, 'sections', {}).values()
+        for view in views + [self._view]:
+            view.release()
+        self._map.close()
+
+
+def is_stale(source: str, target: str) -> bool:
+    """ Checks whether the compiled corpus is missing or older
+    than the word list """
+    if not os.path.exists(target):
+        return True
+    return os.path.getmtime(target) < os.path.getmtime(source)
+
+
+def open_corpus(source: str = corpus_source,
+                target: str = corpus_compiled) -> Corpus:
+    """ Opens the compiled corpus, compiling it first if needed """
+    if is_stale(source, target):
+        compile_corpus(source, target)
+    try:
+        return Corpus(target)
+    except ValueError:
+        compile_corpus(source, target)
+        return Corpus(target)
@@ -0,0 +1,87 @@
+import numpy as np
+from src.corpus import Corpus
+from src.key_stats import KeyStats
+from src.globals import drill_strength, drill_prior, drill_error_rate
+
+
+class Drill:
+    """ Word weights biased toward the words holding the bigrams the user
+    misses most. The score of a word is the sum of the weakness of its
+    bigrams, the weakness of a bigram is how far its error rate, with
+    drill_prior error-free presses added, exceeds drill_error_rate.
+    Scores are kept between the attempts and only the words of the bigrams
+    whose weakness changed are rescored """
+
+    def __init__(self, corpus: Corpus) -> None:
+        self.word_offsets = np.frombuffer(corpus.sections[b'BOFF'],
+                                          dtype=np.uint32)
+        self.word_bigrams = np.frombuffer(corpus.sections[b'BIDX'],
+                                          dtype=np.uint16)
+        self.bigram_offsets = np.frombuffer(corpus.sections[b'WOFF'],
+                                            dtype=np.uint32)
+        self.bigram_words = np.frombuffer(corpus.sections[b'WIDX'],
+                                          dtype=np.uint32)
+        self.base = (np.ones(len(corpus)) if corpus.weights is None
+                     else np.frombuffer(corpus.weights, dtype=float))
+        self.weakness = np.zeros(len(self.bigram_offsets) - 1)
+        self.scores = np.zeros(len(corpus))
+        self.weights = self.base
+        self.cumulative = np.cumsum(self.weights)
+        self.random = np.random.default_rng()
+
+    @staticmethod
+    def bigram_weakness(key_stats: KeyStats) -> np.ndarray:
+        """ Returns the weakness of every bigram slot """
+        hits, errors = (np.frombuffer(counter, dtype=np.uint64).astype(float)
+                        for counter in (key_stats.bigram_hits,
+                                        key_stats.bigram_errors))
+        return np.maximum(errors / (hits + errors + drill_prior)
+                          - drill_error_rate, 0.0)
+
+    def rescore(self, key_stats: KeyStats) -> None:
+        """ Scores every word from scratch """
+        self.weakness = self.bigram_weakness(key_stats)
+        # every word has two bigrams at least, the spaces around it
+        self.scores = np.add.reduceat(self.weakness[self.word_bigrams],
+                                      self.word_offsets[:-1].astype(np.intp))
+        self.reweight()
+
+    def update(self, key_stats: KeyStats) -> None:
+        """ Adds the change of the weakness of every changed bigram
+    to the scores of its words """
+        weakness = self.bigram_weakness(key_stats)
+        changed = np.flatnonzero(weakness != self.weakness)
+        if not len(changed):
+            return
+        starts = self.bigram_offsets[changed].astype(np.intp)
+        counts = self.bigram_offsets[changed + 1].astype(np.intp) - starts
+        # positions of the words of all the changed bigrams in a row
+        positions = (np.arange(counts.sum())
+                     + np.repeat(starts - np.cumsum(counts) + counts, counts))
+        self.scores += np.bincount(
+            self.bigram_words[positions],
+            weights=np.repeat(weakness[changed] - self.weakness[changed],
+                              counts),
+            minlength=len(self.scores))
+        self.weakness = weakness
+        self.reweight()
+
+    def reweight(self) -> None:
+        """ Rebuilds the weights of the words and their running sum
+    the words are drawn by """
+        self.weights = self.base * (1 + drill_strength * self.scores)
+        self.cumulative = np.cumsum(self.weights)
+
+    def draw(self, count: int, indices=None) -> np.ndarray:
+        """ Draws the corpus indices of count words, only from the given
+    indices if there are any. They may come in any order, like the length
+    buckets of a pool """
+        if indices is None:
+            cumulative = self.cumulative
+        else:
+            indices = np.asarray(indices, dtype=np.intp)
+            cumulative = np.cumsum(self.weights[indices])
+        picks = np.searchsorted(cumulative, self.random.random(count)
+                                * cumulative[-1], side='right')
+        picks = np.minimum(picks, len(cumulative) - 1)
+        return picks if indices is None else indices[picks]
@@ -1,4 +1,35 @@
+import os
+
 seconds_left = 3 # number of seconds in the countdown
 mil_per_sec = 1000 # milliseconds per second
 mil_per_min = 60000 # milliseconds per minute
-average_len = 5.28 # average length of Russian word
\ No newline at end of file
+clock_refresh = 100 # milliseconds between updates of the attempt clock
+average_len = 5.28 # average length of Russian word
+corpus_source = "src/russian_words.txt" # word list, one word per line
+corpus_compiled = "src/russian_words.bin" # compiled corpus, rebuilt from the source when stale
+russian_letters = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя" # one bit per letter in word masks
+text_chunk = 20 # words generated at a time while typing
+text_reserve = 300 # characters of upcoming text kept ahead of the user
+text_history = 100 # typed characters kept for display
+text_pool_size = 3 # opening texts generated ahead of the attempts
+keystroke_log_size = 1 << 16 # keystrokes kept in the log of an attempt
+key_latency_limit = 2000000 # microseconds between keystrokes counted as latency, longer is a pause
+measure_latency = os.environ.get("TRAINER_LATENCY") == "1" # key press to paint latency, off by default
+latency_file = "src/latency.txt" # latency histograms of the measured attempts
+history_file = "src/history.db" # SQLite database of the attempts
+history_flush_interval = 1000 # milliseconds an attempt may wait to be saved with the next ones
+history_busy_timeout = 5 # seconds a connection waits for the database to be unlocked
+history_stop_retries = 3 # busy timeouts the writer waits out on shutdown before giving up
+history_page_size = 100 # attempts read at once by the history table
+history_cached_pages = 8 # pages of attempts kept by the history table
+chart_points = 500 # points of a line of the trend chart at most
+chart_min_window = 20 # attempts shown by the trend chart at the closest zoom
+chart_chunk = 10000 # attempts the trend chart reads at a time, the window is repainted between chunks
+heatmap_max_rate = 0.2 # error rate of the reddest key of the heatmap
+worst_bigrams_count = 5 # bigrams listed under the heatmap
+worst_bigrams_presses = 10 # presses of a bigram before it may be listed
+drill_strength = 50 # weight added to a drill word per unit of the weakness of its bigrams
+drill_prior = 20 # error-free presses assumed for every bigram, so rare bigrams are not over-weighted
+drill_error_rate = 0.05 # error rate of a bigram still counted as typed well
+legacy_attempts_log = "src/attempts.bin" # log of the attempts, before the database
+legacy_attempts_file = "src/attempts.txt" # last 10 attempts as text, before the log
\ No newline at end of file
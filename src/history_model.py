@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QDateTime
+from src.history_store import HistoryStore, mode_name
+from src.globals import history_page_size, history_cached_pages
+
+
+class HistoryModel(QAbstractTableModel):
+    """ Table of the attempts read from the history store in pages.
+    Only the pages around the visible rows are kept, so the memory
+    does not grow with the history """
+
+    headers = ("date", "mode", "goal", "wpm", "accuracy", "mistakes")
+    # orders of the sortable columns
+    orders = {0: 'time', 1: 'mode', 3: 'wpm', 4: 'accuracy'}
+
+    def __init__(self, store: HistoryStore, parent=None) -> None:
+        super().__init__(parent)
+        self.store = store
+        self.key = None # (mode, time limit) shown, None for all the modes
+        self.sort_column = 0
+        self.sort_order = Qt.SortOrder.DescendingOrder
+        self.pages = OrderedDict() # page number -> rows, least recent first
+        self.count = 0
+
+    def refresh(self) -> None:
+        """ Drops the read pages and counts the attempts again """
+        self.beginResetModel()
+        self.pages.clear()
+        self.count = self.store.attempts_count(self.key)
+        self.endResetModel()
+
+    def set_key(self, key: tuple) -> None:
+        """ Shows only the attempts of the (mode, time limit) key,
+    all the attempts if the key is None """
+        self.key = key
+        self.refresh()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if (orientation == Qt.Orientation.Horizontal
+                and role == Qt.ItemDataRole.DisplayRole):
+            return self.headers[section]
+        return None
+
+    def data(self, index: QModelIndex,
+             role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = self.row(index.row())
+        if row is None:
+            return None
+        timestamp, mode, time_limit, speed_goal, wpm, accuracy, mistakes = row
+        column = index.column()
+        if column == 0:
+            return (QDateTime.fromSecsSinceEpoch(timestamp).toString(
+                "yyyy-MM-dd hh:mm") if timestamp else "")
+        if column == 1:
+            return mode_name(mode, time_limit)
+        if column == 2:
+            return "" if speed_goal is None else str(speed_goal) + " wpm"
+        if column == 3:
+            return str(round(wpm, 2))
+        if column == 4:
+            return str(round(accuracy, 2)) + '%'
+        return str(mistakes)
+
+    def row(self, number: int) -> tuple:
+        """ Returns the attempt of the row, reading its page if needed
+    and forgetting the least recently used page. None if the history
+    has changed under the model """
+        page_number = number // history_page_size
+        page = self.pages.get(page_number)
+        if page is None:
+            page = self.store.attempts_page(
+                self.key, self.orders[self.sort_column],
+                self.sort_order == Qt.SortOrder.DescendingOrder,
+                page_number * history_page_size, history_page_size)
+            self.pages[page_number] = page
+            if len(self.pages) > history_cached_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(page_number)
+        if number % history_page_size >= len(page):
+            return None
+        return page[number % history_page_size]
+
+    def is_sortable(self, column: int) -> bool:
+        """ Checks whether the column has an order backed by an index """
+        return column in self.orders
+
+    def sort(self, column: int,
+             order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        """ Orders the attempts by the column, the columns that are not
+    sortable keep the current order """
+        if not self.is_sortable(column):
+            return
+        self.sort_column = column
+        self.sort_order = order
+        self.refresh()
@@ -0,0 +1,429 @@
+import os
+import queue
+import sqlite3
+import struct
+import threading
+import time
+from src.running_stats import RunningStats
+from src.key_stats import KeyStats
+from src.keystroke_log import KeystrokeLog
+from src.globals import legacy_attempts_log, legacy_attempts_file, \
+    history_flush_interval, history_busy_timeout, history_stop_retries, \
+    mil_per_sec
+
+schema = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    time INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    time_limit INTEGER NOT NULL,
+    speed_goal INTEGER,
+    wpm REAL NOT NULL,
+    accuracy REAL NOT NULL,
+    mistakes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_mode_time
+    ON attempts (mode, time_limit, time, wpm, accuracy);
+CREATE INDEX IF NOT EXISTS attempts_mode ON attempts (mode, time_limit);
+CREATE INDEX IF NOT EXISTS attempts_wpm ON attempts (wpm, mode, time_limit);
+CREATE INDEX IF NOT EXISTS attempts_accuracy
+    ON attempts (accuracy, mode, time_limit);
+CREATE TABLE IF NOT EXISTS summary (
+    mode TEXT NOT NULL,
+    time_limit INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    wpm_count INTEGER NOT NULL,
+    wpm_mean REAL NOT NULL,
+    wpm_m2 REAL NOT NULL,
+    wpm_best REAL NOT NULL,
+    wpm_worst REAL NOT NULL,
+    accuracy_count INTEGER NOT NULL,
+    accuracy_mean REAL NOT NULL,
+    accuracy_m2 REAL NOT NULL,
+    accuracy_best REAL NOT NULL,
+    accuracy_worst REAL NOT NULL,
+    PRIMARY KEY (mode, time_limit)
+);
+CREATE TABLE IF NOT EXISTS key_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keystrokes (
+    attempt_id INTEGER PRIMARY KEY REFERENCES attempts (id),
+    data BLOB NOT NULL
+);
+"""
+
+# columns of an attempt, in the order of the rows returned by the store
+columns = ('time', 'mode', 'time_limit', 'speed_goal', 'wpm', 'accuracy',
+           'mistakes')
+day = 24 * 60 * 60 # seconds
+
+# orders of the history pages, each one follows an index so that a page
+# is read without sorting the history
+page_orders = {
+    'time': ('id',),
+    'mode': ('mode', 'time_limit', 'id'),
+    'wpm': ('wpm', 'mode', 'time_limit', 'id'),
+    'accuracy': ('accuracy', 'mode', 'time_limit', 'id'),
+}
+
+# records of the log used before the store: unix time, mode in seconds,
+# speed, accuracy
+legacy_record = struct.Struct('<qIdd')
+
+flush_marker = object() # asks the writer to save the batch at once
+stop_marker = object() # asks the writer to save the batch and stop
+
+
+def insert_attempts(connection: sqlite3.Connection, rows: list,
+                    summary_rows=(), key_stats: bytes = None,
+                    keystrokes: list = None) -> None:
+    """ Saves the attempts given as rows of the columns, the summary
+    of their modes and the lifetime key stats in one transaction.
+    keystrokes holds the saved keystroke log of every row, or None for
+    a row without one. The summary is marked with the id of the last
+    attempt saved, which tells whether it is up to date """
+    insert = ("INSERT INTO attempts (" + ", ".join(columns) + ") "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+    with connection:
+        if keystrokes is None:
+            connection.executemany(insert, rows)
+        else:
+            for row, log in zip(rows, keystrokes):
+                attempt_id = connection.execute(insert, row).lastrowid
+                if log is not None:
+                    connection.execute(
+                        "INSERT INTO keystrokes VALUES (?, ?)",
+                        (attempt_id, log))
+        if summary_rows:
+            last_id = connection.execute(
+                "SELECT MAX(id) FROM attempts").fetchone()[0]
+            connection.executemany(
+                "INSERT OR REPLACE INTO summary "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row[:2] + (last_id,) + row[2:] for row in summary_rows])
+        if key_stats is not None:
+            connection.execute(
+                "INSERT OR REPLACE INTO key_stats VALUES (0, ?)", (key_stats,))
+
+
+class HistoryStore:
+    """ History of the attempts in an SQLite database. Statistics are
+    answered by SQL aggregates over the indexes, the history is never
+    read as a whole. Attempts are saved by a writer thread in batches,
+    the reads wait for the attempts saved before them. A summary of every
+    mode is kept in memory and saved with the attempts, it is rebuilt
+    from the attempts when it is missing or inconsistent. The lifetime
+    key stats are kept the same way """
+
+    def __init__(self, path: str) -> None:
+        is_new = not os.path.exists(path)
+        self.connection = sqlite3.connect(path, timeout=history_busy_timeout)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(schema)
+        # sampled statistics of the index, they let the time ranges
+        # skip-scan it by mode
+        self.connection.execute("PRAGMA analysis_limit = 400")
+        self.connection.execute("ANALYZE")
+        if is_new:
+            self.import_legacy_attempts()
+        self.summary = {} # (mode, time limit) -> (wpm, accuracy) stats
+        if not self.load_summary():
+            self.rebuild_summary()
+        row = self.connection.execute(
+            "SELECT data FROM key_stats").fetchone()
+        self.key_stats = KeyStats.from_bytes(row[0]) if row else KeyStats()
+        # the writer reads the key stats while the attempts are merged
+        self.key_stats_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.write_error = None # why the writer stopped with unsaved rows
+        self.writer = threading.Thread(target=self.write_attempts,
+                                       args=(path,), name='history-writer',
+                                       daemon=True)
+        self.writer.start()
+
+    def add_attempt(self, mode: str, time_limit: int, speed_goal: int,
+                    wpm: float, accuracy: float, mistakes: int,
+                    timestamp: int = None, key_stats: KeyStats = None,
+                    keystroke_log: KeystrokeLog = None) -> None:
+        """ Updates the summary of the mode and the lifetime key stats
+    with the ones of the attempt, then hands the attempt and its keystroke
+    log over to the writer and returns at once. The writer saves the
+    lifetime key stats once per batch. speed_goal is None outside
+    the tasks """
+        wpm_stats, accuracy_stats = self.summary.setdefault(
+            (mode, time_limit), (RunningStats(), RunningStats()))
+        wpm_stats.add(wpm)
+        accuracy_stats.add(accuracy)
+        if key_stats is not None:
+            with self.key_stats_lock:
+                self.key_stats.merge(key_stats)
+        self.queue.put(((int(time.time()) if timestamp is None
+                         else timestamp, mode, time_limit, speed_goal,
+                         wpm, accuracy, mistakes),
+                        self.summary_row(mode, time_limit),
+                        key_stats is not None,
+                        None if keystroke_log is None
+                        else keystroke_log.to_bytes()))
+
+    def summary_row(self, mode: str, time_limit: int) -> tuple:
+        """ Returns the summary of the mode as a row to be saved """
+        wpm_stats, accuracy_stats = self.summary[mode, time_limit]
+        return (mode, time_limit) + wpm_stats.state() + accuracy_stats.state()
+
+    def load_summary(self) -> bool:
+        """ Reads the saved summary, returns whether it is consistent
+    and covers every saved attempt """
+        try:
+            rows = self.connection.execute(
+                "SELECT * FROM summary").fetchall()
+            last_id = self.connection.execute(
+                "SELECT MAX(id) FROM attempts").fetchone()[0]
+            summary = {(row[0], row[1]): (RunningStats(*row[3:8]),
+                                          RunningStats(*row[8:13]))
+                       for row in rows}
+            if max((row[2] for row in rows), default=None) != last_id or \
+                    not all(stats.is_valid() for pair in summary.values()
+                            for stats in pair):
+                return False
+        except (sqlite3.Error, TypeError, ValueError):
+            return False
+        self.summary = summary
+        return True
+
+    def rebuild_summary(self) -> None:
+        """ Computes the summary again from all the saved attempts
+    and saves it in place of the old one """
+        self.summary = {}
+        for mode, time_limit, wpm, accuracy in self.connection.execute(
+                "SELECT mode, time_limit, wpm, accuracy FROM attempts "
+                "ORDER BY id"):
+            wpm_stats, accuracy_stats = self.summary.setdefault(
+                (mode, time_limit), (RunningStats(), RunningStats()))
+            wpm_stats.add(wpm)
+            accuracy_stats.add(accuracy)
+        with self.connection:
+            self.connection.execute("DROP TABLE IF EXISTS summary")
+        self.connection.executescript(schema)
+        insert_attempts(self.connection, [], [
+            self.summary_row(*key) for key in self.summary])
+
+    def mode_summary(self) -> list:
+        """ Returns (mode, time limit, wpm stats, accuracy stats)
+    of every mode, the timed modes first """
+        return [key + self.summary[key] for key in sorted(
+            self.summary, key=lambda key: (key[0] != 'time', key))]
+
+    def write_attempts(self, path: str) -> None:
+        """ Saves the attempts of the queue in one transaction per batch.
+    A batch is saved a flush interval after its first attempt, or at once
+    when asked to. A batch that fails goes with the next one; the last
+    batch is retried and, if it still fails, the error is kept for close.
+    Runs in the writer thread with its own connection """
+        connection = sqlite3.connect(path, timeout=history_busy_timeout)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        rows = []
+        keystrokes = []
+        summary_rows = {}
+        is_key_stats_changed = False
+        is_running = True
+        while is_running:
+            items = [self.queue.get()]
+            deadline = time.monotonic() + history_flush_interval / mil_per_sec
+            while items[-1] not in (flush_marker, stop_marker):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            is_running = stop_marker not in items
+            for item in items:
+                if item is not flush_marker and item is not stop_marker:
+                    rows.append(item[0])
+                    keystrokes.append(item[3])
+                    summary_rows[item[1][:2]] = item[1]
+                    is_key_stats_changed |= item[2]
+            tries = 1 if is_running else history_stop_retries
+            try:
+                for retry in range(tries):
+                    key_stats = None
+                    if is_key_stats_changed:
+                        with self.key_stats_lock:
+                            key_stats = self.key_stats.to_bytes()
+                    try:
+                        insert_attempts(connection, rows,
+                                        list(summary_rows.values()),
+                                        key_stats, keystrokes)
+                    except sqlite3.Error as error:
+                        # busy for the whole timeout or failing,
+                        # the rows go with the next batch
+                        if not is_running and retry + 1 == tries:
+                            self.write_error = error
+                        continue
+                    rows = []
+                    keystrokes = []
+                    summary_rows = {}
+                    is_key_stats_changed = False
+                    break
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+        connection.close()
+
+    def flush(self) -> None:
+        """ Waits until the attempts handed over so far are saved """
+        if self.writer.is_alive():
+            self.queue.put(flush_marker)
+            self.queue.join()
+
+    def last_attempts(self, count: int) -> list:
+        """ Returns the last attempts, the newest attempt first """
+        self.flush()
+        return self.connection.execute(
+            "SELECT " + ", ".join(columns) + " FROM attempts "
+            "ORDER BY id DESC LIMIT ?", (count,)).fetchall()
+
+    def attempts_count(self, key: tuple = None) -> int:
+        """ Returns the number of attempts of the (mode, time limit) key,
+    of all the modes if the key is None """
+        if key is None:
+            return sum(wpm_stats.count for wpm_stats, _ in
+                       self.summary.values())
+        return self.summary[key][0].count if key in self.summary else 0
+
+    def attempts_page(self, key: tuple, order: str, is_descending: bool,
+                      offset: int, count: int) -> list:
+        """ Returns count attempts of the (mode, time limit) key, of all
+    the modes if the key is None, starting at the offset in the order """
+        self.flush()
+        direction = " DESC" if is_descending else ""
+        where = ""
+        if key is not None:
+            # the unary plus keeps SQLite on the index of the order
+            # instead of sorting every attempt of the mode
+            plus = '+' if order in ('wpm', 'accuracy') else ''
+            where = ("WHERE " + plus + "mode = ? AND " + plus
+                     + "time_limit = ? ")
+        return self.connection.execute(
+            "SELECT " + ", ".join(columns) + " FROM attempts " + where
+            + "ORDER BY " + ", ".join(column + direction
+                                      for column in page_orders[order])
+            + " LIMIT ? OFFSET ?",
+            (key or ()) + (count, offset)).fetchall()
+
+    def attempt_series(self, key: tuple, after_id: int = 0,
+                       count: int = -1) -> list:
+        """ Returns (id, wpm, accuracy) of the first count attempts,
+    all of them if count is negative, of the (mode, time limit) key, of
+    all the modes if the key is None, saved after the attempt with the id,
+    in the order they were made """
+        self.flush()
+        where = "WHERE id > ? "
+        if key is not None:
+            where += "AND mode = ? AND time_limit = ? "
+        return self.connection.execute(
+            "SELECT id, wpm, accuracy FROM attempts " + where
+            + "ORDER BY id LIMIT ?", (after_id,) + (key or ()) + (count,)
+            ).fetchall()
+
+    def attempt_keystrokes(self, attempt_id: int) -> KeystrokeLog:
+        """ Returns the keystroke log of the attempt, None if it was
+    saved without one """
+        self.flush()
+        row = self.connection.execute(
+            "SELECT data FROM keystrokes WHERE attempt_id = ?",
+            (attempt_id,)).fetchone()
+        return KeystrokeLog.from_bytes(row[0]) if row else None
+
+    def best_per_mode(self) -> list:
+        """ Returns (mode, time limit, best wpm, attempts) for every mode """
+        self.flush()
+        return self.connection.execute(
+            "SELECT mode, time_limit, MAX(wpm), COUNT(*) FROM attempts "
+            "GROUP BY mode, time_limit").fetchall()
+
+    def average_since(self, since: int) -> list:
+        """ Returns (mode, time limit, average wpm, average accuracy)
+    over the attempts made since the unix time """
+        self.flush()
+        return self.connection.execute(
+            "SELECT mode, time_limit, AVG(wpm), AVG(accuracy) "
+            "FROM attempts WHERE time >= ? "
+            "GROUP BY mode, time_limit", (since,)).fetchall()
+
+    def week_average(self) -> list:
+        """ Returns the averages of the last 7 days for every mode """
+        return self.average_since(int(time.time()) - 7 * day)
+
+    def accuracy_trend(self, mode: str, time_limit: int,
+                       since: int = 0) -> list:
+        """ Returns (day, average accuracy) of the mode by days,
+    the day is counted in days since the epoch """
+        self.flush()
+        return self.connection.execute(
+            "SELECT time / ?, AVG(accuracy) FROM attempts "
+            "WHERE mode = ? AND time_limit = ? AND time >= ? "
+            "GROUP BY time / ? ORDER BY time / ?",
+            (day, mode, time_limit, since, day, day)).fetchall()
+
+    def import_legacy_attempts(self) -> None:
+        """ Moves the attempts of the files used before the store
+    into the new database """
+        rows = []
+        if os.path.exists(legacy_attempts_log):
+            with open(legacy_attempts_log, 'rb') as file:
+                data = file.read()
+            data = data[:len(data) - len(data) % legacy_record.size]
+            for timestamp, mode, speed, accuracy in legacy_record.iter_unpack(
+                    data):
+                rows.append((timestamp, 'time', mode, None, speed, accuracy,
+                             0))
+        elif os.path.exists(legacy_attempts_file):
+            with open(legacy_attempts_file, 'r') as file:
+                for line in file:
+                    try:
+                        mode, speed, accuracy = line.split(" | ")
+                        rows.append((0, 'time', int(mode.split()[0]), None,
+                                     float(speed.split()[0]),
+                                     float(accuracy.strip().rstrip('%')), 0))
+                    except ValueError:
+                        continue
+            rows.reverse() # the file listed the newest attempt first
+        insert_attempts(self.connection, rows)
+
+    def close(self) -> None:
+        """ Saves the attempts handed over so far, stops the writer
+    and closes the database. Raises the error of the writer if some
+    attempts could not be saved """
+        if self.writer.is_alive():
+            self.queue.put(stop_marker)
+            self.writer.join()
+        self.connection.close()
+        if self.write_error is not None:
+            raise self.write_error
+
+
+def mode_name(mode: str, time_limit: int) -> str:
+    """ Returns the name of the mode shown to the user """
+    if mode == 'time':
+        return str(time_limit) + " sec"
+    if mode == 'drill':
+        return "drill, " + str(time_limit) + " sec"
+    return "task, " + str(time_limit) + " sec"
+
+
+def format_summary(mode: str, time_limit: int, wpm_stats: RunningStats,
+                   accuracy_stats: RunningStats) -> str:
+    """ Returns the line of the mode on the statistics page """
+    return (mode_name(mode, time_limit) + ": "
+            + str(wpm_stats.count) + " attempts | "
+            + str(round(wpm_stats.mean, 1)) + " ± "
+            + str(round(wpm_stats.deviation(), 1)) + " wpm, best "
+            + str(round(wpm_stats.best, 1)) + ", worst "
+            + str(round(wpm_stats.worst, 1)) + " | "
+            + str(round(accuracy_stats.mean, 1)) + " ± "
+            + str(round(accuracy_stats.deviation(), 1)) + '%')
@@ -0,0 +1,63 @@
+import numpy as np
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QPainter, QColor, QFont, QPaintEvent
+from PyQt6.QtWidgets import QWidget
+from src.key_stats import KeyStats, char_slot
+from src.globals import heatmap_max_rate
+
+# the rows of the ЙЦУКЕН layout, every next row is shifted right
+keyboard_rows = ("ёйцукенгшщзхъ", "фывапролджэ", "ячсмитьбю")
+row_shift = 0.5 # of a key width
+
+
+class KeyHeatmap(QWidget):
+    """ Keyboard with every key coloured by its error rate, from white
+    for no errors to red for heatmap_max_rate and more. A key shows
+    its error rate and its mean latency """
+
+    def __init__(self, key_stats: KeyStats, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.key_stats = key_stats
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """ Draws the keys and the space bar """
+        presses, error_rates, latencies = self.key_stats.key_rates()
+        painter = QPainter(self)
+        size = min(self.width() / (len(keyboard_rows[0]) + 1),
+                   self.height() / (len(keyboard_rows) + 1))
+        font = painter.font()
+        for row, keys in enumerate(keyboard_rows):
+            for column, char in enumerate(keys):
+                self.draw_key(painter, QRectF(
+                    (column + row * row_shift) * size, row * size, size,
+                    size).adjusted(2, 2, -2, -2), char, char_slot(char),
+                    presses, error_rates, latencies, font)
+        self.draw_key(painter, QRectF(
+            3 * size, len(keyboard_rows) * size, 6 * size, size).adjusted(
+            2, 2, -2, -2), "space", char_slot(' '), presses, error_rates,
+            latencies, font)
+
+    @staticmethod
+    def draw_key(painter: QPainter, rect: QRectF, name: str, slot: int,
+                 presses: np.ndarray, error_rates: np.ndarray,
+                 latencies: np.ndarray, font: QFont) -> None:
+        """ Draws the key with its name, error rate and latency """
+        heat = min(error_rates[slot] / heatmap_max_rate, 1.0)
+        painter.setPen(Qt.GlobalColor.gray)
+        painter.setBrush(QColor(255, round(255 * (1 - heat)),
+                                round(255 * (1 - heat))))
+        painter.drawRoundedRect(rect, 6, 6)
+        painter.setPen(Qt.GlobalColor.black)
+        font.setPointSize(max(round(rect.height() / 4), 6))
+        painter.setFont(font)
+        painter.drawText(rect.adjusted(0, 4, 0, 0), Qt.AlignmentFlag.AlignTop
+                         | Qt.AlignmentFlag.AlignHCenter, name)
+        if not presses[slot]:
+            return
+        font.setPointSize(max(round(rect.height() / 8), 6))
+        painter.setFont(font)
+        painter.drawText(rect.adjusted(0, 0, 0, -4),
+                         Qt.AlignmentFlag.AlignBottom
+                         | Qt.AlignmentFlag.AlignHCenter,
+                         str(round(error_rates[slot] * 100, 1)) + "% "
+                         + str(round(latencies[slot])) + " ms")
@@ -0,0 +1,141 @@
+from array import array
+import numpy as np
+from src.globals import russian_letters, key_latency_limit
+
+# every character has a slot: the letters, the space and all the others
+slot_chars = russian_letters + ' '
+slot_count = len(slot_chars) + 1
+other_slot = slot_count - 1
+slot_table = array('B', [other_slot]) * (max(map(ord, slot_chars)) + 1)
+for slot, char in enumerate(slot_chars):
+    slot_table[ord(char)] = slot
+
+# counters kept for every key and every bigram
+fields = ('hits', 'errors', 'timed', 'latency')
+
+
+def char_slot(char: str) -> int:
+    """ Returns the slot of the character """
+    code = ord(char)
+    return slot_table[code] if code < len(slot_table) else other_slot
+
+
+class KeyStats:
+    """ Hits, errors and latency of every expected key and every bigram
+    of expected keys, in flat arrays indexed by the slots of the
+    characters. The bigram (a, b) is at a * slot_count + b. Recording
+    a keystroke is O(1) and creates no objects """
+
+    def __init__(self) -> None:
+        self.key_hits = array('Q', bytes(8 * slot_count))
+        self.key_errors = array('Q', bytes(8 * slot_count))
+        self.key_timed = array('Q', bytes(8 * slot_count)) # hits timed
+        self.key_latency = array('Q', bytes(8 * slot_count)) # sum, us
+        self.bigram_hits = array('Q', bytes(8 * slot_count ** 2))
+        self.bigram_errors = array('Q', bytes(8 * slot_count ** 2))
+        self.bigram_timed = array('Q', bytes(8 * slot_count ** 2))
+        self.bigram_latency = array('Q', bytes(8 * slot_count ** 2))
+
+    def counters(self) -> tuple:
+        """ Returns the arrays of the counters, keys then bigrams """
+        return (self.key_hits, self.key_errors, self.key_timed,
+                self.key_latency, self.bigram_hits, self.bigram_errors,
+                self.bigram_timed, self.bigram_latency)
+
+    def record(self, previous: str, expected: str, is_correct: bool,
+               interval: int) -> None:
+        """ Counts the keystroke on the expected key and on the bigram
+    of the previous key, '' at the start of the text. The interval since
+    the previous keystroke, in microseconds, is the latency of a hit;
+    longer intervals than key_latency_limit are pauses and not timed """
+        key = char_slot(expected)
+        bigram = char_slot(previous) * slot_count + key if previous else -1
+        if not is_correct:
+            self.key_errors[key] += 1
+            if bigram >= 0:
+                self.bigram_errors[bigram] += 1
+            return
+        self.key_hits[key] += 1
+        is_timed = 0 <= interval <= key_latency_limit
+        if is_timed:
+            self.key_timed[key] += 1
+            self.key_latency[key] += interval
+        if bigram >= 0:
+            self.bigram_hits[bigram] += 1
+            if is_timed:
+                self.bigram_timed[bigram] += 1
+                self.bigram_latency[bigram] += interval
+
+    def merge(self, other: 'KeyStats') -> None:
+        """ Adds the counters of the other stats to these ones """
+        for counter, addition in zip(self.counters(), other.counters()):
+            np.frombuffer(counter, dtype=np.uint64)[:] += np.frombuffer(
+                addition, dtype=np.uint64)
+
+    def to_bytes(self) -> bytes:
+        """ Returns the counters to be saved """
+        return b''.join(counter.tobytes() for counter in self.counters())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KeyStats':
+        """ Restores the saved counters, returns empty stats if the data
+    does not fit the slots """
+        stats = cls()
+        if len(data) != sum(8 * len(counter)
+                            for counter in stats.counters()):
+            return stats
+        start = 0
+        for counter in stats.counters():
+            end = start + 8 * len(counter)
+            np.frombuffer(counter, dtype=np.uint64)[:] = np.frombuffer(
+                data[start:end], dtype=np.uint64)
+            start = end
+        return stats
+
+    @staticmethod
+    def rates(hits: array, errors: array, timed: array,
+              latency: array) -> tuple:
+        """ Returns numpy arrays of the presses, the error rates and the
+    mean latencies in milliseconds of the counters """
+        hits, errors, timed, latency = (
+            np.frombuffer(counter, dtype=np.uint64).astype(float)
+            for counter in (hits, errors, timed, latency))
+        presses = hits + errors
+        with np.errstate(divide='ignore', invalid='ignore'):
+            error_rates = np.where(presses > 0, errors / presses, 0.0)
+            latencies = np.where(timed > 0, latency / timed / 1000, 0.0)
+        return presses, error_rates, latencies
+
+    def key_rates(self) -> tuple:
+        """ Returns the presses, error rates and mean latencies in ms
+    of every key slot """
+        return self.rates(self.key_hits, self.key_errors, self.key_timed,
+                          self.key_latency)
+
+    def bigram_rates(self) -> tuple:
+        """ Returns the presses, error rates and mean latencies in ms
+    of every bigram slot """
+        return self.rates(self.bigram_hits, self.bigram_errors,
+                          self.bigram_timed, self.bigram_latency)
+
+    def worst_bigrams(self, count: int, min_presses: int) -> list:
+        """ Returns (bigram, presses, error rate, latency ms) of the
+    bigrams with the highest error rates among those pressed at least
+    min_presses times """
+        presses, error_rates, latencies = self.bigram_rates()
+        candidates = np.flatnonzero(presses >= min_presses)
+        order = candidates[np.lexsort((-latencies[candidates],
+                                       -error_rates[candidates]))][:count]
+        return [(bigram_name(index), int(presses[index]),
+                 float(error_rates[index]), float(latencies[index]))
+                for index in order]
+
+
+def slot_name(slot: int) -> str:
+    """ Returns the character of the slot, '?' for the other characters """
+    return slot_chars[slot] if slot < len(slot_chars) else '?'
+
+
+def bigram_name(index: int) -> str:
+    """ Returns the two characters of the bigram slot """
+    return slot_name(index // slot_count) + slot_name(index % slot_count)
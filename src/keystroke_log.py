@@ -0,0 +1,70 @@
+from array import array
+from src.globals import keystroke_log_size
+
+# bytes of a keystroke saved by to_bytes: time, expected, typed, correct
+record_size = 8 + 4 + 4 + 1
+
+
+class KeystrokeLog:
+    """ Ring buffer of the keystrokes of an attempt. Every field is
+    a preallocated array, recording a keystroke creates no objects """
+
+    def __init__(self, capacity: int = keystroke_log_size) -> None:
+        self.capacity = capacity
+        self.times = array('q', bytes(8 * capacity)) # monotonic, ns
+        self.expected = array('I', bytes(4 * capacity)) # code points
+        self.typed = array('I', bytes(4 * capacity)) # 0 if no text
+        self.correct = array('B', bytes(capacity))
+        self.count = 0 # keystrokes recorded, including overwritten ones
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def record(self, time_ns: int, expected: int, typed: int,
+               correct: bool) -> None:
+        """ Stores the keystroke, overwriting the oldest one when full """
+        position = self.count % self.capacity
+        self.times[position] = time_ns
+        self.expected[position] = expected
+        self.typed[position] = typed
+        self.correct[position] = correct
+        self.count += 1
+
+    def clear(self) -> None:
+        """ Forgets the keystrokes, the arrays are kept """
+        self.count = 0
+
+    def ordered(self) -> tuple:
+        """ Returns copies of the times, expected and typed characters
+    and correctness flags, oldest keystroke first """
+        size = len(self)
+        start = self.count % self.capacity if self.count > size else 0
+        columns = []
+        for column in (self.times, self.expected, self.typed, self.correct):
+            columns.append(column[start:size] + column[:start])
+        return tuple(columns)
+
+    def events(self):
+        """ Yields (time_ns, expected, typed, correct) for every
+    keystroke, oldest first, the characters are strings """
+        for time_ns, expected, typed, correct in zip(*self.ordered()):
+            typed = chr(typed) if typed else ''
+            yield time_ns, chr(expected), typed, bool(correct)
+
+    def to_bytes(self) -> bytes:
+        """ Returns the columns of the ordered keystrokes one after
+    another, to be saved """
+        return b''.join(column.tobytes() for column in self.ordered())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KeystrokeLog':
+        """ Restores the saved keystrokes into a log just as large """
+        size = len(data) // record_size
+        log = cls(size)
+        start = 0
+        for column in (log.times, log.expected, log.typed, log.correct):
+            end = start + size * column.itemsize
+            column[:] = array(column.typecode, data[start:end])
+            start = end
+        log.count = size
+        return log
@@ -0,0 +1,108 @@
+import time
+from array import array
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtWidgets import QWidget
+
+sub_bits = 5 # 32 buckets per power of two, about 3% precision
+sub_count = 1 << sub_bits
+max_shift = 32
+
+
+class LatencyHistogram:
+    """ HDR-style histogram of latencies in microseconds: exact below
+    64 us, then every power of two is split into 32 buckets """
+
+    def __init__(self) -> None:
+        self.counts = array('Q', bytes(8 * sub_count * (max_shift + 2)))
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value: int) -> int:
+        """ Returns the bucket of the value """
+        if value < 2 * sub_count:
+            return value
+        shift = value.bit_length() - sub_bits - 1
+        return (shift + 1) * sub_count + (value >> shift) - sub_count
+
+    @staticmethod
+    def bucket_top(index: int) -> int:
+        """ Returns the largest value of the bucket """
+        if index < 2 * sub_count:
+            return index
+        shift = index // sub_count - 1
+        return ((index % sub_count + sub_count + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """ Adds the latency in microseconds """
+        index = min(self.bucket(max(value, 0)), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> int:
+        """ Returns the latency not exceeded by the given percent
+    of the recorded ones, to the precision of the buckets """
+        if not self.total:
+            return 0
+        rank = max(1, round(self.total * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_top(index), self.max)
+        return self.max
+
+    def summary(self) -> str:
+        """ Returns the p50/p95/p99 line of the results page """
+        return "latency p50/p95/p99: {} / {} / {} ms".format(
+            *(round(self.percentile(percent) / 1000, 1)
+              for percent in (50, 95, 99)))
+
+    def dump(self, path: str) -> None:
+        """ Appends the summary and the non-empty buckets to the file """
+        with open(path, 'a') as file:
+            file.write(self.summary() + ", " + str(self.total) + " keys\n")
+            for index, count in enumerate(self.counts):
+                if count:
+                    file.write("  <= " + str(self.bucket_top(index))
+                               + " us: " + str(count) + "\n")
+
+
+class LatencyProbe(QObject):
+    """ Event filter measuring the time from a key press to the next
+    paint of the typing labels. Nothing is measured, and nothing costs,
+    unless the probe is installed """
+
+    def __init__(self, window: QWidget, *labels: QWidget) -> None:
+        super().__init__(window)
+        self.histogram = LatencyHistogram()
+        self.pressed_at = None
+        self.labels = labels
+        window.installEventFilter(self)
+        for label in labels:
+            label.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        """ Stamps key presses, paints the label and records
+    the latency on the first paint after a key press """
+        if event.type() == QEvent.Type.KeyPress:
+            self.pressed_at = time.perf_counter_ns()
+        elif (event.type() == QEvent.Type.Paint
+              and self.pressed_at is not None and watched in self.labels):
+            watched.event(event)
+            self.histogram.record(
+                (time.perf_counter_ns() - self.pressed_at) // 1000)
+            self.pressed_at = None
+            return True
+        return False
+
+    def discard(self) -> None:
+        """ Forgets the last key press, it did not reach the typing
+    session and its paint is not a latency """
+        self.pressed_at = None
+
+    def reset(self) -> None:
+        """ Starts a new histogram for the next attempt """
+        self.histogram = LatencyHistogram()
+        self.pressed_at = None
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple:
+    """ Downsamples the series to threshold points by Largest-Triangle-
+    Three-Buckets: the first and the last points are kept, and from every
+    bucket between them the point making the largest triangle with the
+    point kept before it and the mean of the next bucket """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return x, y
+    # bucket i takes the points from starts[i] to starts[i + 1]
+    starts = (np.arange(threshold - 1) * ((size - 2) / (threshold - 2))
+              ).astype(np.intp) + 1
+    starts[-1] = size - 1
+    mean_x = np.add.reduceat(x[1:-1], starts[:-1] - 1) / np.diff(starts)
+    mean_y = np.add.reduceat(y[1:-1], starts[:-1] - 1) / np.diff(starts)
+    # the bucket after the last one is the last point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+    chosen = np.empty(threshold, dtype=np.intp)
+    chosen[0] = 0
+    chosen[-1] = size - 1
+    kept_x, kept_y = x[0], y[0]
+    for bucket in range(threshold - 2):
+        start, end = starts[bucket], starts[bucket + 1]
+        # doubled area of the triangle of the kept point, the points
+        # of the bucket and the mean of the next bucket
+        areas = np.abs((kept_x - next_x[bucket]) * (y[start:end] - kept_y)
+                       - (kept_x - x[start:end]) * (next_y[bucket] - kept_y))
+        index = start + int(areas.argmax())
+        chosen[bucket + 1] = index
+        kept_x, kept_y = x[index], y[index]
+    return x[chosen], y[chosen]
@@ -1,8 +1,16 @@
-from PyQt6.QtGui import QKeyEvent
+import sqlite3
+from PyQt6.QtGui import QKeyEvent, QShowEvent, QCloseEvent, QPalette, QColor
 from PyQt6.QtCore import Qt, QSize, QTimer, QTime
-from PyQt6.QtWidgets import QMainWindow, QPushButton, QLabel, QFileDialog, QLineEdit, QWidget
-from src.text_generating import text_generate
-from src.add_attempt import add_attempt
+from PyQt6.QtWidgets import QMainWindow, QPushButton, QLabel, QFileDialog, QLineEdit, QWidget, QStackedWidget, QComboBox, QTableView, QHeaderView, QMessageBox
+from src.text_generating import attempt_text, is_corpus_loaded, warm_up, update_drill
+from src.typing_session import TypingSession
+from src.text_viewport import TextViewport
+from src.latency import LatencyProbe
+from src.attempt_scheduler import AttemptScheduler
+from src.history_store import HistoryStore, format_summary, mode_name
+from src.history_model import HistoryModel
+from src.trend_chart import TrendChart
+from src.key_heatmap import KeyHeatmap
 from src.alignments_list import alignments_list
 from src.globals import *
 
@@ -13,130 +21,206 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Keyboard Trainer")
         self.setFixedSize(QSize(1400, 900))
-        self.main_menu()
-        self.button_exit = self.create_button("exit", 1150, 50, 200, 60, 28)
+        self.scheduler = AttemptScheduler(self)
+        self.scheduler.countdown_tick.connect(self.update_timer_count)
+        self.scheduler.started.connect(self.start_typing)
+        self.scheduler.refresh.connect(self.update_time)
+        self.scheduler.deadline.connect(self.end_attempt)
+        self.stack = QStackedWidget(self)
+        self.setCentralWidget(self.stack)
+        self.pages = {}
+        self.latency_probe = None
+        self.history = HistoryStore(history_file)
+        update_drill(self.history.key_stats)
+        self.button_exit = self.create_button(self, "exit", 1150, 50, 200,
+                                              60, 28)
         self.button_exit.clicked.connect(self.close)
-    
-    def main_menu(self) -> None:
-        """ Displays the start menu page """
-        self.button15 = self.create_button('15 sec', 550, 200, 300, 80, 32)
-        self.button30 = self.create_button('30 sec', 550, 300, 300, 80, 32)
-        self.button60 = self.create_button('60 sec', 550, 400, 300, 80, 32)
-        self.button_user = self.create_button('user mode', 550, 500, 300,
-                                              80, 32)
-        self.button_stat = self.create_button('statistics', 550, 600, 300,
-                                              80, 32)
-        self.time_limit = 0
-        self.user_mode = False
+        self.main_menu()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """ Starts loading the words after the menu has been painted """
+        super().showEvent(event)
+        QTimer.singleShot(0, warm_up)
+
+    def show_page(self, name: str) -> QWidget:
+        """ Switches to the page, the page is built on the first visit
+    and reused afterwards """
+        if name not in self.pages:
+            page = QWidget()
+            getattr(self, 'build_' + name + '_page')(page)
+            self.pages[name] = page
+            self.stack.addWidget(page)
+        page = self.pages[name]
+        for button in page.findChildren(QPushButton):
+            button.setChecked(False)
+        self.stack.setCurrentWidget(page)
+        self.button_exit.raise_()
+        return page
+
+    def build_menu_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the start menu """
+        self.button15 = self.create_button(page, '15 sec', 550, 200, 300,
+                                           80, 32)
+        self.button30 = self.create_button(page, '30 sec', 550, 300, 300,
+                                           80, 32)
+        self.button60 = self.create_button(page, '60 sec', 550, 400, 300,
+                                           80, 32)
+        self.button_user = self.create_button(page, 'user mode', 550, 500,
+                                              300, 80, 32)
+        self.button_drill = self.create_button(page, 'drill', 550, 600,
+                                               300, 80, 32)
+        self.button_stat = self.create_button(page, 'statistics', 550, 700,
+                                              300, 80, 32)
         self.button15.clicked.connect(self.set_mode(self.switch_to_mode, 15))
         self.button30.clicked.connect(self.set_mode(self.switch_to_mode, 30))
         self.button60.clicked.connect(self.set_mode(self.switch_to_mode, 60))
         self.button_user.clicked.connect(self.set_mode(
             self.switch_to_mode, 0))
+        self.button_drill.clicked.connect(self.set_mode(
+            self.switch_to_mode, 60, True))
         self.button_stat.clicked.connect(self.open_stat_page)
+
+    def main_menu(self) -> None:
+        """ Displays the start menu page """
+        self.time_limit = 0
+        self.user_mode = False
+        self.is_drill = False
         self.is_launched = False
+        self.show_exit_button(True)
+        self.show_page('menu')
+
+    def build_attempt_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the attempt page """
+        self.label_countdown = self.create_label(page, 600, 350, 200, 100,
+                                                 80, 'centre')
+        self.label_time = self.create_label(page, 600, 350, 200, 100, 24,
+                                            'centre')
+        self.label_str1 = self.create_label(page, 200, 450, 500, 80, 40,
+                                            'right')
+        self.label_str1.setStyleSheet("color: rgb(35, 45, 130)")
+        self.label_str2 = self.create_label(page, 700, 450, 500, 80, 40,
+                                            'left')
+        self.create_text_palettes(self.label_str2)
+        self.view_str1 = TextViewport(self.label_str1)
+        self.view_str2 = TextViewport(self.label_str2)
+        self.label_mistakes = self.create_label(page, 800, 550, 400, 80, 24,
+                                                'right')
+        self.label_mistakes.setStyleSheet("color: rgb(170, 20, 35)")
+        self.label_enter = self.create_label(page, 550, 800, 400, 80, 14,
+                                             'centre')
+        self.label_enter.setText("press enter to pause")
+        if measure_latency:
+            self.latency_probe = LatencyProbe(self, self.label_str1,
+                                              self.label_str2)
 
     def launch(self) -> None:
-        """ Creates an attempt window, allows the user typing """
+        """ Shows the attempt page, allows the user typing
+    after the countdown """
         self.is_launched = False
-        self.countdown()
-        self.count_signs = 0
-        self.mistakes = 0
-        self.label_countdown.hide()
-
-        self.timer = QTimer()
-        self.timer.setInterval(10)
-        self.timer.timeout.connect(self.update_time)
         self.start_time = QTime(0, 0, 0, 0)
         self.current_time = self.start_time
+        self.scheduler.start(self.start_time.msecsTo(self.time_limit))
+        self.session = TypingSession(attempt_text(self.is_drill))
 
-        self.label_time = self.create_label(600, 350, 200, 100, 24, 'centre')
-        self.label_str1 = self.create_label(200, 450, 500, 80, 40, 'right')
-        self.label_str1.setStyleSheet("color: rgb(35, 45, 130)")
-        self.label_str2 = self.create_label(700, 450, 500, 80, 40, 'left')
-        self.label_str2.setStyleSheet("color: rgb(150, 150, 150)")
-
-        self.string1 = ''
-        self.string2 = text_generate()
-        self.label_str1.setText(self.string1)
-        self.label_str2.setText(self.string2)
+        self.show_page('attempt')
+        self.label_countdown.hide()
+        self.label_time.hide()
+        self.label_time.setText("")
+        self.label_str2.setPalette(self.palette_normal)
+        self.label_str1.setText("")
+        self.label_str2.setText("")
+        if self.latency_probe is not None:
+            self.latency_probe.reset()
+
+        if is_corpus_loaded():
+            self.fill_text()
+        else:
+            warm_up()
 
-        self.label_mistakes = self.create_label(800, 550, 400, 80, 24,
-                                                'right')
-        self.label_mistakes.setStyleSheet("color: rgb(170, 20, 35)")
         self.label_mistakes.setText("mistakes: " + "0")
-        self.is_mistake = False
-
-        self.button_exit.hide()
-        self.button_exit.setEnabled(False)
-        self.label_enter = self.create_label(550, 800, 400, 80, 14, 'centre')
-        self.label_enter.setText("press enter to pause")
+        self.show_exit_button(False)
 
     def update_time(self) -> None:
-        """ Updates the attempt timer """
+        """ Updates the attempt clock, the end of the attempt
+    is handled by the deadline timer """
         if not self.is_launched:
             return
-        self.current_time = self.current_time.addMSecs(self.timer.interval())
+        self.current_time = self.start_time.addMSecs(
+            self.scheduler.elapsed_msecs())
         self.label_time.setText(self.current_time.toString("mm:ss.zzz"))
-        if self.time_limit < self.current_time:
-            self.end_attempt()
 
     def keyPressEvent(self, event: QKeyEvent) -> None:
         """ Handles keystrokes when the user is typing """
         if not self.is_launched:
+            self.discard_latency()
             return
 
         if event.key() == Qt.Key.Key_Return or event.key() == Qt.Key.Key_Enter:
             self.pause()
             return
 
-        if (event.text() != self.string2[0] and
-            not (event.text() == 'е' and self.string2[0] == 'ё')):
-            self.label_str2.setStyleSheet(
-                "background-color: rgb(220, 85, 85); color: rgb(150, 150, 150)")
-            if not self.is_mistake:
-                self.mistakes += 1
-                self.label_mistakes.setText("mistakes: " + str(self.mistakes))
-            self.is_mistake = True
+        mistakes = self.session.mistakes
+        was_mistake = self.session.is_mistake
+        is_correct = self.session.press(event.text())
+        if self.session.is_mistake != was_mistake:
+            self.label_str2.setPalette(self.palette_mistake
+                                       if self.session.is_mistake
+                                       else self.palette_normal)
+        if not is_correct:
+            if self.session.mistakes != mistakes:
+                self.label_mistakes.setText("mistakes: " +
+                                            str(self.session.mistakes))
             return
-        self.is_mistake = False
-        self.count_signs += 1
-        self.label_str2.setStyleSheet("color: rgb(150, 150, 150)")
-        self.string1 += self.string2[0]
-        self.string2 = self.string2[1:]
-        self.label_str1.setText(self.string1)
-        self.label_str2.setText(self.string2)
+        self.show_text()
+
+    def create_text_palettes(self, label: QLabel) -> None:
+        """ Prepares the palettes of the text to type: the normal one
+    and the one highlighting a mistake, switching palettes is much
+    cheaper than setting a style sheet """
+        label.setAutoFillBackground(True)
+        self.palette_normal = QPalette(label.palette())
+        self.palette_normal.setColor(QPalette.ColorRole.WindowText,
+                                     QColor(150, 150, 150))
+        self.palette_mistake = QPalette(self.palette_normal)
+        self.palette_mistake.setColor(QPalette.ColorRole.Window,
+                                      QColor(220, 85, 85))
+
+    def fill_text(self) -> None:
+        """ Fills the attempt text and shows it """
+        self.session.fill()
+        self.show_text()
+
+    def show_text(self) -> None:
+        """ Shows the characters around the cursor that fit
+    into the labels """
+        text, cursor = self.session.text, self.session.cursor
+        self.label_str1.setText(self.view_str1.tail(text, cursor))
+        self.label_str2.setText(self.view_str2.head(text, cursor))
 
     def end_attempt(self) -> None:
         """ Fixes the results of the attempt and
     switches to the attempt statistics page """
-        self.attempt_time = self.current_time
+        self.attempt_time = self.start_time.addMSecs(
+            self.scheduler.elapsed_msecs())
         self.is_launched = False
-        self.hide_labels(self.label_time, self.label_str1, self.label_str2,
-                         self.label_mistakes, self.label_enter)
-        self.button_exit.setEnabled(True)
-        self.button_exit.show()
+        self.show_exit_button(True)
         self.attempt_stat()
 
-    def hide_stat_attempt(self) -> None:
-        """ Disables widgets from the attempt statistics page"""
-        self.hide_labels(self.label_result, self.label_accuracy,
-                         self.label_speed, self.label_done, self.label_failed)
-        self.hide_buttons(self.button_restart, self.button_to_menu)
-
-    def user_task_selection(self) -> None:
-        """ Displays the user tasks page """
-        self.button_new_task = self.create_button("create task", 600, 300,
-                                                   300, 80, 32)
+    def build_user_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the user tasks page """
+        self.button_new_task = self.create_button(page, "create task", 600,
+                                                  300, 300, 80, 32)
         self.button_new_task.clicked.connect(self.create_task_page)
-        self.button_upload = self.create_button("upload task", 600, 400, 300,
-                                                80, 32)
+        self.button_upload = self.create_button(page, "upload task", 600, 400,
+                                                300, 80, 32)
         self.button_upload.clicked.connect(self.file_selection)
-        self.button_to_menu = self.create_button("menu", 600, 500, 300,
-                                                 80, 32)
-        self.button_to_menu.clicked.connect(
-            self.back_from_user_task_selection(self.main_menu))
+        button_to_menu = self.create_button(page, "menu", 600, 500, 300,
+                                            80, 32)
+        button_to_menu.clicked.connect(self.main_menu)
 
+    def user_task_selection(self) -> None:
+        """ Displays the user tasks page """
+        self.show_page('user')
 
     def file_selection(self) -> None:
         """ Opens the file selection window,
@@ -154,63 +238,60 @@ class MainWindow(QMainWindow):
         else:
             self.button_upload.setChecked(False)
             return
-        self.hide_buttons(self.button_new_task, self.button_upload,
-                          self.button_to_menu)
         self.task_info_page()
-        
+
+    def build_task_info_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the task information page """
+        label_task = self.create_label(page, 500, 250, 400, 100, 52,
+                                       'centre')
+        label_task.setText("Task:")
+        self.label_task_speed = self.create_label(page, 450, 350, 400, 100,
+                                                  32, 'left')
+        self.label_task_time = self.create_label(page, 450, 400, 400, 100,
+                                                 32, 'left')
+        button_start_task = self.create_button(page, "start", 350, 550, 300,
+                                               80, 32)
+        button_to_menu = self.create_button(page, "menu", 750, 550, 300,
+                                            80, 32)
+        button_start_task.clicked.connect(self.launch)
+        button_to_menu.clicked.connect(self.main_menu)
+
     def task_info_page(self) -> None:
         """ Shows the user the task parameters """
-        self.label_task = self.create_label(500, 250, 400, 100, 52, 'centre')
-        self.label_task_speed = self.create_label(450, 350, 400, 100, 32,
-                                                  'left')
-        self.label_task_time = self.create_label(450, 400, 400, 100, 32,
-                                                 'left')
-        self.label_task.setText("Task:")
+        self.show_page('task_info')
         self.label_task_speed.setText("Speed: " + str(self.speed_goal) +
                                       " wpm")
         self.label_task_time.setText("Time: " + str(self.time_limit) + " sec")
         self.time_limit = QTime(0, 0, 0, 0).addSecs(self.time_limit)
-        self.button_start_task = self.create_button("start", 350, 550, 300,
-                                                    80, 32)
-        self.button_to_menu = self.create_button("menu", 750, 550, 300,
-                                                 80, 32)
-        self.button_start_task.clicked.connect(self.launch_task(self.launch))
-        self.button_to_menu.clicked.connect(self.back_from_task_info(
-            self.main_menu))
 
-    def create_task_page(self) -> None:
-        """ Displays the page where the user creates the task """
-        self.hide_buttons(self.button_new_task, self.button_upload,
-                          self.button_to_menu)
-        self.label_input_speed = self.create_label(350, 250, 300, 80, 32,
-                                                   'centre')
-        self.label_input_speed.setText("speed: ")
-        self.label_input_time = self.create_label(750, 250, 300, 80, 32,
-                                                  'centre')
-        self.label_input_time.setText("time:")
-        self.edit_speed = self.create_line_edit(350, 350, 300, 80, 32)
-        self.edit_time = self.create_line_edit(750, 350, 300, 80, 32)
-
-        self.button_go = self.create_button("go!", 550, 500, 300, 80, 32)
+    def build_create_task_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the page where the user
+    creates the task """
+        label_input_speed = self.create_label(page, 350, 250, 300, 80, 32,
+                                              'centre')
+        label_input_speed.setText("speed: ")
+        label_input_time = self.create_label(page, 750, 250, 300, 80, 32,
+                                             'centre')
+        label_input_time.setText("time:")
+        self.edit_speed = self.create_line_edit(page, 350, 350, 300, 80, 32)
+        self.edit_time = self.create_line_edit(page, 750, 350, 300, 80, 32)
+
+        self.button_go = self.create_button(page, "go!", 550, 500, 300,
+                                            80, 32)
         self.button_go.clicked.connect(self.start_create_task)
 
-        self.button_get_file = self.create_button("get a file", 550, 600, 300,
-                                                  80, 32)
+        self.button_get_file = self.create_button(page, "get a file", 550,
+                                                  600, 300, 80, 32)
         self.button_get_file.clicked.connect(self.get_file)
-        self.button_to_menu = self.create_button("menu", 550, 700, 300,
-                                                 80, 32)
-        self.button_to_menu.clicked.connect(self.back_from_create_task(
-            self.main_menu))
-
-    def hide_create_task_page(self) -> None:
-        """ Disables widgets from the creating task page """
-        self.hide_labels(self.label_input_speed, self.label_input_time)
-        self.hide_buttons(self.button_go, self.button_get_file,
-                          self.button_to_menu)
-        self.edit_speed.hide()
-        self.edit_speed.setEnabled(False)
-        self.edit_time.hide()
-        self.edit_time.setEnabled(False)
+        button_to_menu = self.create_button(page, "menu", 550, 700, 300,
+                                            80, 32)
+        button_to_menu.clicked.connect(self.main_menu)
+
+    def create_task_page(self) -> None:
+        """ Displays the page where the user creates the task """
+        self.show_page('create_task')
+        self.edit_speed.clear()
+        self.edit_time.clear()
 
     def get_file(self) -> None:
         """ Saves the created task to the selected folder """
@@ -234,21 +315,37 @@ class MainWindow(QMainWindow):
             self.speed_goal = int(self.edit_speed.text())
             self.time_limit = QTime(0, 0, 0, 0).addSecs(
                 int(self.edit_time.text()))
-            self.hide_create_task_page()
             self.launch()
         else:
             self.button_go.setChecked(False)
             return
 
-    def attempt_stat(self) -> None:
-        """ Counts and displays the results of the attempt """
-        self.label_result = self.create_label(500, 250, 400, 100, 52,
-                                              'centre')
-        self.label_speed = self.create_label(450, 350, 400, 100, 32, 'left')
-        self.label_accuracy = self.create_label(450, 400, 400, 100, 32,
+    def build_results_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the attempt statistics page """
+        label_result = self.create_label(page, 500, 250, 400, 100, 52,
+                                         'centre')
+        label_result.setText("Your result:")
+        self.label_speed = self.create_label(page, 450, 350, 400, 100, 32,
+                                             'left')
+        self.label_accuracy = self.create_label(page, 450, 400, 400, 100, 32,
                                                 'left')
-        self.label_result.setText("Your result:")
+        button_to_menu = self.create_button(page, "menu", 550, 600, 300,
+                                            80, 32)
+        button_restart = self.create_button(page, "restart", 550, 700, 300,
+                                            80, 32)
+        button_restart.clicked.connect(self.launch)
+        button_to_menu.clicked.connect(self.main_menu)
+        self.label_verdict = self.create_label(page, 500, 500, 400, 100, 52,
+                                               'centre')
+        self.label_latency = self.create_label(page, 450, 800, 500, 60, 16,
+                                               'centre')
 
+    def attempt_stat(self) -> None:
+        """ Counts and displays the results of the attempt """
+        self.show_page('results')
+        self.count_signs = self.session.count_signs
+        self.mistakes = self.session.mistakes
+        self.keystroke_log = self.session.log
         if self.count_signs == 0:
             self.res_speed = 0
             self.accuracy = 0
@@ -263,168 +360,190 @@ class MainWindow(QMainWindow):
             self.label_accuracy.setText("accuracy: " + str(self.accuracy)
                                         + "%")
 
-        self.button_to_menu = self.create_button("menu", 550, 600, 300,
-                                                 80, 32)
-        self.button_restart = self.create_button("restart", 550, 700, 300,
-                                                 80, 32)
-        self.button_restart.clicked.connect(self.restart_task(self.launch))
-        self.button_to_menu.clicked.connect(self.back_from_res(
-            self.main_menu))
-        self.label_done = self.create_label(500, 500, 400, 100, 52, 'centre')
-        self.label_failed = self.create_label(500, 500, 400, 100, 52,
-                                              'centre')
+        self.label_verdict.setText("")
+        if self.latency_probe is not None:
+            self.label_latency.setText(self.latency_probe.histogram.summary())
+            self.latency_probe.histogram.dump(latency_file)
         if self.user_mode:
             self.check_res()
-        add_attempt(self.time_limit.second(), self.res_speed, self.accuracy) 
-
-    def countdown(self) -> None:
-        """ Starts the countdown """
-        self.label_countdown = self.create_label(600, 350, 200, 100, 80,
-                                                 'centre')
-        self.seconds_left = seconds_left
-        self.timer_count = QTimer(self)
-        self.timer_count.setInterval(mil_per_sec)
-        self.timer_count.timeout.connect(self.update_timer_count)
-        self.timer_count.start()
-
-    def update_timer_count(self) -> None:
-        """ Updates countdown timer with the set interval
-    and at the end launches an attempt"""
-        self.label_countdown.setText(str(self.seconds_left))
+        self.history.add_attempt(
+            'task' if self.user_mode else 'drill' if self.is_drill else 'time',
+            QTime(0, 0, 0, 0).secsTo(self.time_limit),
+            self.speed_goal if self.user_mode else None, self.res_speed,
+            self.accuracy, self.mistakes, key_stats=self.session.key_stats,
+            keystroke_log=self.keystroke_log)
+        update_drill(self.history.key_stats)
+
+    def update_timer_count(self, seconds: int) -> None:
+        """ Shows the seconds left in the countdown, the text is filled
+    as soon as the words are loaded """
+        self.label_countdown.setText(str(seconds))
         self.label_countdown.show()
-        self.seconds_left -= 1
-        if self.seconds_left == -1:
-            self.timer_count.stop()
-            self.label_countdown.hide()
-            self.label_time.show()
-            self.timer.start()
-            self.is_launched = True  
-
-    def hide_task_info_page(self) -> None:
-        """ Disables widgets from the task information page """
-        self.hide_buttons(self.button_start_task, self.button_to_menu)
-        self.hide_labels(self.label_task, self.label_task_speed,
-                         self.label_task_time) 
-
-    def back_from_task_info(self, main_menu):
-        """ Goes to the main menu from the task information page """ 
-        def wrapped():
-            self.hide_task_info_page()
-            main_menu()
-        return wrapped
-    
-    def back_from_res(self, main_menu):
-        """ Goes to the main menu from the task result page """
-        def wrapped():
-            self.hide_stat_attempt()
-            main_menu()
-        return wrapped
-    
-    def back_from_stat(self, main_menu):
-        """ Goes to the main menu from the user's statistics page """
-        def wrapped():
-            self.hide_labels(self.label_stat, self.label_last_attempts)
-            self.button_to_menu.hide()
-            main_menu()
-        return wrapped
-    
-    def back_from_user_task_selection(self, main_menu):
-        """ Goes to the main menu from the user task selection page """
-        def wrapped():
-            self.hide_buttons(self.button_to_menu, self.button_new_task,
-                              self.button_upload)
-            main_menu()
-        return wrapped
-    
-    def back_from_create_task(self, main_menu):
-        """ Goes to the main menu from create task page """
-        def wrapped():
-            self.hide_create_task_page()
-            main_menu()
-        return wrapped
+        if not self.session.text and (is_corpus_loaded() or seconds == 0):
+            self.fill_text()
 
-    def back_from_pause(self, main_menu):
-        """ Goes to the main menu from pause page """
-        def wrapped():
-            self.hide_labels(self.label_pause, self.label_time)
-            self.hide_buttons(self.button_continue, self.button_to_menu)
-            main_menu()
-        return wrapped          
-
-    def launch_task(self, launch):
-        """ Starts the attempt """
-        def wrapped():
-            self.hide_task_info_page()
-            launch()
-        return wrapped
-    
-    def restart_task(self, launch):
-        """ Disables widgets and restarts the attempt """
-        def wrapped():
-            self.hide_stat_attempt()
-            launch()
-        return wrapped
+    def start_typing(self) -> None:
+        """ Allows the user typing when the countdown is over """
+        self.label_countdown.hide()
+        self.label_time.show()
+        self.is_launched = True
 
     def check_res(self) -> None:
         """ Checks whether the user has completed the task
     successfully and displays the result """
         if self.res_speed >= self.speed_goal:
-            self.label_done.setText("Completed!")
-            self.label_done.setStyleSheet("color: rgb(10, 115, 45)")
+            self.label_verdict.setText("Completed!")
+            self.label_verdict.setStyleSheet("color: rgb(10, 115, 45)")
         else:
-            self.label_failed.setText("Failed!")
-            self.label_failed.setStyleSheet("color: rgb(170, 20, 35)")
+            self.label_verdict.setText("Failed!")
+            self.label_verdict.setStyleSheet("color: rgb(170, 20, 35)")
 
-    def set_mode(self, switch_to_mode, time_limit: int):
-        """ Sets the mode and relevant limits """
+    def set_mode(self, switch_to_mode, time_limit: int,
+                 is_drill: bool = False):
+        """ Sets the mode and relevant limits, a drill favours the words
+    with the user's weakest bigrams """
         def wrapped():
             self.user_mode = not bool(time_limit)
+            self.is_drill = is_drill
             self.time_limit = QTime(0, 0, 0, 0).addSecs(time_limit)
             return switch_to_mode()
         return wrapped
 
     def switch_to_mode(self) -> None:
         """ Launches a new attempt or goes to the user tasks page """
-        self.hide_buttons(self.button15, self.button30, self.button60,
-                          self.button_user, self.button_stat)
         if self.user_mode:
             self.user_task_selection()
         else:
             self.launch()
 
-    def open_stat_page(self) -> None:
-        """ Displays the user's statistics page with information
-    about the last 10 attempts """
-        self.hide_buttons(self.button15, self.button30, self.button60,
-                          self.button_user, self.button_stat)
-        self.label_last_attempts = self.create_label(450, 80, 500, 80, 32,
-                                                     'centre')
-        self.label_last_attempts.setText("Last 10 attempts:")
-        self.label_stat = self.create_label(200, 200, 1000, 500, 32, 'left')
+    def build_stat_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the user's statistics page """
+        label_modes = self.create_label(page, 450, 30, 500, 60, 28,
+                                        'centre')
+        label_modes.setText("Statistics by mode:")
+        self.label_stat = self.create_label(page, 150, 100, 1100, 170, 18,
+                                            'left')
         self.label_stat.setWordWrap(True)
-        with open("src/attempts.txt", "r") as file:
-            self.label_stat.setText(file.read())
-        self.button_to_menu = self.create_button("menu", 550, 750, 300,
-                                                 80, 32)
-        self.button_to_menu.clicked.connect(self.back_from_stat(
-            self.main_menu))
-
-    def hide_buttons(self, *args: QLabel) -> None:
-        """ Disable all buttons """
-        for button in args:
-            button.setEnabled(False)
-            button.hide()
-
-    def hide_labels(self, *args: QLabel) -> None:
-        """ Hides all labels """
-        for label in args:
-            label.hide()
-
-    def create_label(self, pos_weight: int,
+        self.combo_mode = QComboBox(page)
+        self.combo_mode.move(150, 290)
+        self.combo_mode.resize(300, 40)
+        self.combo_mode.currentIndexChanged.connect(self.select_history_mode)
+        self.button_chart = self.create_button(page, "chart", 1050, 290, 200,
+                                               40, 18)
+        self.button_chart.clicked.connect(self.toggle_history_view)
+        self.is_chart_shown = False # kept when the page is left
+        button_keys = self.create_button(page, "keys", 830, 290, 200, 40, 18)
+        button_keys.clicked.connect(self.open_keys_page)
+        self.trend_chart = TrendChart(self.history, page)
+        self.trend_chart.move(150, 340)
+        self.trend_chart.resize(1100, 390)
+        self.trend_chart.hide()
+        self.history_model = HistoryModel(self.history, page)
+        self.table_history = QTableView(page)
+        self.table_history.move(150, 340)
+        self.table_history.resize(1100, 390)
+        self.table_history.setModel(self.history_model)
+        self.table_history.verticalHeader().hide()
+        self.table_history.verticalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Fixed)
+        header = self.table_history.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        header.setSortIndicator(self.history_model.sort_column,
+                                self.history_model.sort_order)
+        header.sortIndicatorChanged.connect(self.keep_sort_indicator)
+        self.table_history.setSortingEnabled(True)
+        button_to_menu = self.create_button(page, "menu", 550, 750, 300,
+                                            80, 32)
+        button_to_menu.clicked.connect(self.main_menu)
+
+    def open_stat_page(self) -> None:
+        """ Displays the user's statistics page with the summary
+    of every mode """
+        self.show_page('stat')
+        summaries = self.history.mode_summary()
+        self.label_stat.setText('\n'.join(
+            format_summary(*summary) for summary in summaries))
+        key = self.combo_mode.currentData()
+        self.combo_mode.blockSignals(True)
+        self.combo_mode.clear()
+        self.combo_mode.addItem("all modes", None)
+        for mode, time_limit, _, _ in summaries:
+            self.combo_mode.addItem(mode_name(mode, time_limit),
+                                    (mode, time_limit))
+        for index in range(self.combo_mode.count()):
+            if self.combo_mode.itemData(index) == key:
+                self.combo_mode.setCurrentIndex(index)
+        self.combo_mode.blockSignals(False)
+        self.select_history_mode()
+        self.show_history_view()
+
+    def build_keys_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the page of the errors by key """
+        label_keys = self.create_label(page, 450, 30, 500, 60, 28, 'centre')
+        label_keys.setText("Errors by key:")
+        self.key_heatmap = KeyHeatmap(self.history.key_stats, page)
+        self.key_heatmap.move(150, 130)
+        self.key_heatmap.resize(1100, 370)
+        self.label_bigrams = self.create_label(page, 150, 520, 1100, 200, 18,
+                                               'left')
+        button_to_stat = self.create_button(page, "statistics", 350, 750,
+                                            300, 80, 32)
+        button_to_stat.clicked.connect(self.open_stat_page)
+        button_to_menu = self.create_button(page, "menu", 750, 750, 300,
+                                            80, 32)
+        button_to_menu.clicked.connect(self.main_menu)
+
+    def open_keys_page(self) -> None:
+        """ Displays the lifetime errors by key and the worst bigrams """
+        self.show_page('keys')
+        self.key_heatmap.update()
+        bigrams = self.history.key_stats.worst_bigrams(worst_bigrams_count,
+                                                       worst_bigrams_presses)
+        self.label_bigrams.setText("Worst bigrams:\n" + '\n'.join(
+            "«" + bigram + "»: " + str(round(rate * 100, 1)) + "% errors, "
+            + str(round(latency)) + " ms, " + str(presses) + " presses"
+            for bigram, presses, rate, latency in bigrams))
+
+    def select_history_mode(self) -> None:
+        """ Shows the attempts of the mode chosen in the combo box """
+        key = self.combo_mode.currentData()
+        self.history_model.set_key(key)
+        self.trend_chart.set_key(key)
+
+    def toggle_history_view(self) -> None:
+        """ Switches the history between the table and the chart """
+        self.is_chart_shown = not self.is_chart_shown
+        self.show_history_view()
+
+    def show_history_view(self) -> None:
+        """ Shows the history as the table or the chart, whichever
+    was chosen last. show_page unchecks the buttons, so the toggle
+    is checked again from the kept state """
+        is_chart = self.is_chart_shown
+        self.button_chart.setChecked(is_chart)
+        self.button_chart.setText("table" if is_chart else "chart")
+        self.table_history.setVisible(not is_chart)
+        self.trend_chart.setVisible(is_chart)
+        if is_chart:
+            self.trend_chart.refresh()
+
+    def keep_sort_indicator(self, column: int, order: Qt.SortOrder) -> None:
+        """ Puts the sort indicator back on the sorted column when
+    a column that cannot be sorted is clicked """
+        if not self.history_model.is_sortable(column):
+            self.table_history.horizontalHeader().setSortIndicator(
+                self.history_model.sort_column, self.history_model.sort_order)
+
+    def show_exit_button(self, is_shown: bool) -> None:
+        """ Shows or hides the exit button above the pages """
+        self.button_exit.setEnabled(is_shown)
+        self.button_exit.setVisible(is_shown)
+
+    def create_label(self, parent: QWidget, pos_weight: int,
                      pos_height: int, size_weight: int,
                      size_height: int, point_size: int, align: str) -> QLabel:
         """ Creates label and sets its parameters """
-        label = QLabel(self)
+        label = QLabel(parent)
         label.move(pos_weight, pos_height)
         label.resize(size_weight, size_height)
         font = label.font()
@@ -434,11 +553,11 @@ class MainWindow(QMainWindow):
         label.show()
         return label
 
-    def create_button(self, title: str, pos_weight: int,
+    def create_button(self, parent: QWidget, title: str, pos_weight: int,
                      pos_height: int, size_weight: int,
                      size_height: int, point_size: int) -> QPushButton:
         """ Creates button and sets its parameters"""
-        button = QPushButton(title, self)
+        button = QPushButton(title, parent)
         button.move(pos_weight, pos_height)
         button.resize(size_weight, size_height)
         font = button.font()
@@ -447,12 +566,12 @@ class MainWindow(QMainWindow):
         button.setCheckable(True)
         button.show()
         return button
-    
-    def create_line_edit(self, pos_weight: int,
+
+    def create_line_edit(self, parent: QWidget, pos_weight: int,
                          pos_height: int, size_weight: int,
                          size_height: int, point_size: int) -> QLineEdit:
         """ Create LineEdit and sets its parameters """
-        edit_line = QLineEdit(self)
+        edit_line = QLineEdit(parent)
         font = edit_line.font()
         font.setPointSize(point_size)
         edit_line.setFont(font)
@@ -461,38 +580,62 @@ class MainWindow(QMainWindow):
         edit_line.resize(size_weight, size_height)
         return edit_line
 
+    def build_pause_page(self, page: QWidget) -> None:
+        """ Creates the widgets of the pause page """
+        self.label_pause_time = self.create_label(page, 600, 350, 200, 100,
+                                                  24, 'centre')
+        label_pause = self.create_label(page, 550, 450, 300, 80, 52,
+                                        'centre')
+        label_pause.setText("pause")
+        button_continue = self.create_button(page, "continue", 550, 600, 300,
+                                             80, 32)
+        button_continue.clicked.connect(self.continue_attempt)
+        button_to_menu = self.create_button(page, "menu", 550, 700, 300,
+                                            80, 32)
+        button_to_menu.clicked.connect(self.back_from_pause)
+
+    def discard_latency(self) -> None:
+        """ Keeps the latency probe, if any, from timing the last key
+    press, which did not reach the typing session """
+        if self.latency_probe is not None:
+            self.latency_probe.discard()
+
     def pause(self) -> None:
         """ Pauses the attempt """
-        self.timer.stop()
+        self.scheduler.pause()
+        self.discard_latency()
         self.is_launched = False
-        self.hide_labels(self.label_str1, self.label_str2,
-                         self.label_mistakes, self.label_enter)
-        self.label_pause = self.create_label(550, 450, 300, 80, 52, 'centre')
-        self.label_pause.setText("pause")
-        self.button_continue = self.create_button("continue", 550, 600, 300,
-                                                  80, 32)
-        self.button_continue.clicked.connect(self.continue_attempt)
-        self.button_to_menu = self.create_button("menu", 550, 700, 300,
-                                                 80, 32)
-        self.button_to_menu.clicked.connect(self.back_from_pause(
-            self.main_menu))
-        self.button_exit.show()
-        self.button_exit.setEnabled(True)
+        self.show_page('pause')
+        self.label_pause_time.setText(self.label_time.text())
+        self.show_exit_button(True)
+
+    def back_from_pause(self) -> None:
+        """ Goes to the main menu from pause page """
+        self.scheduler.cancel()
+        self.main_menu()
 
     def continue_attempt(self) -> None:
         """ Continues the attempt after a pause """
-        self.hide_labels(self.label_pause, self.label_time)
-        self.hide_buttons(self.button_continue, self.button_to_menu,
-                          self.button_exit)
-        self.timer.start()
-        self.countdown()
-        self.label_str1.show()
-        self.label_str2.show()
-        self.label_mistakes.show() 
-        self.label_enter.show()
+        self.discard_latency()
+        self.show_exit_button(False)
+        self.show_page('attempt')
+        self.label_time.hide()
+        self.scheduler.resume()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """ Saves the attempts still waiting for the writer, tells
+    the user if they could not be saved. The chart stops reading
+    the attempts first """
+        if 'stat' in self.pages:
+            self.trend_chart.stop()
+        try:
+            self.history.close()
+        except sqlite3.Error as error:
+            QMessageBox.critical(self, "Keyboard Trainer",
+                                 "The last attempts could not be saved: "
+                                 + str(error))
+        super().closeEvent(event)
 
     def close(self) -> None:
         """ Closes the main window, the application is terminated """
         QWidget.close(self)
-
-
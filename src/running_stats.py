@@ -0,0 +1,42 @@
+import math
+
+
+class RunningStats:
+    """ Count, mean, variance, best and worst of a series of values,
+    updated in O(1) per value by Welford's algorithm """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 best: float = None, worst: float = None) -> None:
+        self.count = count
+        self.mean = mean
+        self.m2 = m2 # sum of squared deviations from the mean
+        self.best = best
+        self.worst = worst
+
+    def add(self, value: float) -> None:
+        """ Takes the value into account """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.best = value if self.best is None else max(self.best, value)
+        self.worst = value if self.worst is None else min(self.worst, value)
+
+    def variance(self) -> float:
+        """ Returns the sample variance, 0 for less than two values """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def deviation(self) -> float:
+        """ Returns the sample standard deviation """
+        return math.sqrt(self.variance())
+
+    def state(self) -> tuple:
+        """ Returns (count, mean, m2, best, worst) to be saved """
+        return self.count, self.mean, self.m2, self.best, self.worst
+
+    def is_valid(self) -> bool:
+        """ Checks that a loaded state is consistent """
+        return (self.count > 0 and self.m2 >= 0
+                and all(math.isfinite(value) for value in
+                        (self.mean, self.m2, self.best, self.worst))
+                and self.worst <= self.best)
@@ -1,7 +1,128 @@
-import random
-from src.russian_words import russian_words_list
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.corpus import Corpus, open_corpus
+from src.drill import Drill
+from src.key_stats import KeyStats
+from src.globals import text_chunk, text_pool_size
 
-def text_generate(gen_size = 100) -> str:
-    """ Generating a string of random words """
-    text = [random.choice(russian_words_list) for _ in range(gen_size)]
-    return ' '.join(text)
\ No newline at end of file
+russian_words = None # opened on first use, see load_corpus
+corpus_lock = threading.Lock()
+drill = None # built on the first drill, see load_drill
+drill_stats = None # the latest key stats of the user
+drill_lock = threading.Lock()
+
+def load_corpus() -> Corpus:
+    """ Opens the corpus on first use, waits for the warm-up
+    if it is already loading """
+    global russian_words
+    with corpus_lock:
+        if russian_words is None:
+            russian_words = open_corpus()
+    return russian_words
+
+def is_corpus_loaded() -> bool:
+    """ Checks whether the corpus can be used without waiting """
+    return russian_words is not None
+
+def load_drill() -> Drill:
+    """ Builds the drill weights on first use from the latest key stats """
+    global drill
+    words = load_corpus()
+    with drill_lock:
+        if drill is None:
+            drill = Drill(words)
+            if drill_stats is not None:
+                drill.rescore(drill_stats)
+    return drill
+
+def update_drill(key_stats: KeyStats) -> None:
+    """ Reweights the drill words after the key stats have changed,
+    only remembers the stats if no drill has been built yet """
+    global drill_stats
+    with drill_lock:
+        drill_stats = key_stats
+        if drill is not None:
+            drill.update(key_stats)
+
+def text_generate(gen_size = 100, letters: str = None, prefix: str = None,
+                  min_len: int = None, max_len: int = None,
+                  adaptive: bool = False) -> str:
+    """ Generating a string of random words. The words can be limited
+    to the given letters, prefix and length range. Adaptive texts favour
+    the words with the bigrams the user misses most """
+    words = load_corpus()
+    pool = words.query(letters, prefix, min_len, max_len)
+    if not pool:
+        raise ValueError("no words match the given filters")
+    if adaptive:
+        weights = load_drill()
+        with drill_lock:
+            indices = weights.draw(gen_size, None if pool is words.pool
+                                   else pool.indices)
+        text = [words[index] for index in indices.tolist()]
+    else:
+        text = [words[pool.draw()] for _ in range(gen_size)]
+    return ' '.join(text)
+
+def text_stream(chunk_size = text_chunk, letters: str = None,
+                prefix: str = None, min_len: int = None,
+                max_len: int = None, adaptive: bool = False):
+    """ Endlessly yields chunks of random words, every chunk ends
+    with a space so the chunks can be joined as they are """
+    while True:
+        yield text_generate(chunk_size, letters, prefix,
+                            min_len, max_len, adaptive) + ' '
+
+class TextPool:
+    """ Keeps a few opening texts generated ahead of time
+    by a worker thread """
+
+    def __init__(self, size: int = text_pool_size,
+                 gen_size: int = 2 * text_chunk) -> None:
+        self.size = size
+        self.gen_size = gen_size
+        self.texts = deque()
+        self.worker = ThreadPoolExecutor(max_workers=1,
+                                         thread_name_prefix='text-pool')
+        self.refilling = None
+
+    def refill(self):
+        """ Starts topping the pool up in the background unless
+    it is being done already, returns the future of the job """
+        if self.refilling is None or self.refilling.done():
+            self.refilling = self.worker.submit(self.fill)
+        return self.refilling
+
+    def fill(self) -> None:
+        """ Generates texts until the pool is full, runs in the worker """
+        while len(self.texts) < self.size:
+            self.texts.append(text_generate(self.gen_size) + ' ')
+
+    def take(self) -> str:
+        """ Returns a ready text, generating one on the spot only if
+    the pool is empty, and starts refilling the pool """
+        try:
+            text = self.texts.popleft()
+        except IndexError:
+            text = text_generate(self.gen_size) + ' '
+        self.refill()
+        return text
+
+
+text_pool = TextPool()
+
+def warm_up() -> None:
+    """ Loads the corpus and fills the text pool in the background """
+    if len(text_pool.texts) < text_pool.size:
+        text_pool.refill()
+
+def attempt_text(adaptive: bool = False):
+    """ Yields the opening text of an attempt from the pool,
+    then endless chunks from the text stream. Adaptive texts depend
+    on the latest attempt, so they are never taken from the pool """
+    if adaptive:
+        yield from text_stream(adaptive=True)
+    else:
+        yield text_pool.take()
+        yield from text_stream()
\ No newline at end of file
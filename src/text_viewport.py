@@ -0,0 +1,42 @@
+from PyQt6.QtGui import QFontMetrics
+from PyQt6.QtWidgets import QLabel
+
+
+class TextViewport:
+    """ Picks the characters of a text that fit into a label,
+    so the label never lays out more than it can show """
+
+    def __init__(self, label: QLabel) -> None:
+        self.metrics = QFontMetrics(label.font())
+        self.width = label.contentsRect().width()
+        self.advances = {} # character widths in pixels
+
+    def advance(self, char: str) -> int:
+        """ Returns the width of the character, measured once """
+        width = self.advances.get(char)
+        if width is None:
+            width = self.metrics.horizontalAdvance(char)
+            self.advances[char] = width
+        return width
+
+    def head(self, text: str, start: int = 0) -> str:
+        """ Returns the characters visible from the start of the text,
+    including the one cut by the right edge """
+        filled = 0
+        end = start
+        while end < len(text) and filled < self.width:
+            filled += self.advance(text[end])
+            end += 1
+        return text[start:end]
+
+    def tail(self, text: str, end: int = None) -> str:
+        """ Returns the characters visible up to the end of the text,
+    including the one cut by the left edge """
+        if end is None:
+            end = len(text)
+        filled = 0
+        start = end
+        while start > 0 and filled < self.width:
+            start -= 1
+            filled += self.advance(text[start])
+        return text[start:end]
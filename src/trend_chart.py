@@ -0,0 +1,160 @@
+import numpy as np
+from PyQt6.QtCore import Qt, QPointF, QLineF, QRectF, QTimer
+from PyQt6.QtGui import QPainter, QPen, QColor, QPaintEvent, QWheelEvent
+from PyQt6.QtWidgets import QWidget
+from src.history_store import HistoryStore
+from src.lttb import lttb
+from src.globals import chart_points, chart_min_window, chart_chunk
+
+wpm_color = QColor(10, 115, 45)
+accuracy_color = QColor(40, 90, 170)
+margin = 50 # pixels around the plot for the axis labels
+
+
+class TrendChart(QWidget):
+    """ Chart of the wpm and the accuracy of the attempts in the order
+    they were made. Zooming in shows fewer of the last attempts, the lines
+    of every zoom level are downsampled once and cached. The attempts are
+    read in chunks, one per pass of the event loop """
+
+    def __init__(self, store: HistoryStore, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.store = store
+        self.key = None # (mode, time limit) shown, None for all the modes
+        self.last_id = 0 # id of the last attempt read
+        self.wpm = np.empty(0)
+        self.accuracy = np.empty(0)
+        self.level = 0 # the last len / 2 ** level attempts are shown
+        self.lines = {} # zoom level -> downsampled wpm and accuracy lines
+        self.is_loading = False
+
+    def set_key(self, key: tuple) -> None:
+        """ Shows only the attempts of the (mode, time limit) key,
+    all the attempts if the key is None """
+        if key == self.key:
+            return
+        self.key = key
+        self.last_id = 0
+        self.wpm = np.empty(0)
+        self.accuracy = np.empty(0)
+        self.level = 0
+        self.lines.clear()
+        if self.isVisible():
+            self.refresh()
+
+    def refresh(self) -> None:
+        """ Starts reading the attempts saved since the last refresh """
+        if not self.is_loading:
+            self.is_loading = True
+            self.read_chunk()
+
+    def stop(self) -> None:
+        """ Stops reading the attempts, the chunk left to the event loop
+    is not read. Called before the store is closed """
+        self.is_loading = False
+
+    def read_chunk(self) -> None:
+        """ Reads the next chunk of the attempts and leaves the following
+    one to the next pass of the event loop, until every attempt is read
+    or the reading is stopped. A new key read from its first attempt on """
+        if not self.is_loading:
+            return
+        rows = self.store.attempt_series(self.key, self.last_id, chart_chunk)
+        if rows:
+            series = np.array(rows, dtype=float)
+            self.last_id = rows[-1][0]
+            self.wpm = np.concatenate((self.wpm, series[:, 1]))
+            self.accuracy = np.concatenate((self.accuracy, series[:, 2]))
+            self.lines.clear()
+        if len(rows) == chart_chunk:
+            QTimer.singleShot(0, self.read_chunk)
+        else:
+            self.is_loading = False
+        self.update()
+
+    def max_level(self) -> int:
+        """ Returns the closest zoom level, it shows chart_min_window
+    attempts at least """
+        level = 0
+        while len(self.wpm) >> (level + 1) >= chart_min_window:
+            level += 1
+        return level
+
+    def wheelEvent(self, event: QWheelEvent) -> None:
+        """ Zooms in or out on the last attempts """
+        step = 1 if event.angleDelta().y() > 0 else -1
+        level = min(max(self.level + step, 0), self.max_level())
+        if level != self.level:
+            self.level = level
+            self.update()
+
+    def visible_range(self) -> tuple:
+        """ Returns the first and the end attempt shown at the zoom level """
+        size = len(self.wpm)
+        return size - max(size >> self.level, min(size, chart_min_window)), \
+            size
+
+    def zoom_lines(self) -> tuple:
+        """ Returns the wpm and the accuracy lines of the zoom level
+    as (x, y) arrays downsampled to chart_points points """
+        if self.level not in self.lines:
+            start, end = self.visible_range()
+            x = np.arange(start, end, dtype=float)
+            self.lines[self.level] = (
+                lttb(x, self.wpm[start:end], chart_points),
+                lttb(x, self.accuracy[start:end], chart_points))
+        return self.lines[self.level]
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """ Draws the axes and the lines of the zoom level """
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        plot = QRectF(margin, margin / 2, self.width() - 2 * margin,
+                      self.height() - 1.5 * margin)
+        painter.drawRect(plot)
+        if self.is_loading or not len(self.wpm):
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter,
+                             "reading attempts: " + str(len(self.wpm))
+                             if self.is_loading else "no attempts yet")
+            return
+        start, end = self.visible_range()
+        (wpm_x, wpm_y), (accuracy_x, accuracy_y) = self.zoom_lines()
+        top_wpm = max(float(wpm_y.max()), 1.0)
+        self.draw_line(painter, plot, wpm_x, wpm_y / top_wpm, start, end,
+                       wpm_color)
+        self.draw_line(painter, plot, accuracy_x, accuracy_y / 100, start,
+                       end, accuracy_color)
+        painter.setPen(wpm_color)
+        painter.drawText(QRectF(0, plot.top() - 10, margin - 5, 20),
+                         Qt.AlignmentFlag.AlignRight, str(round(top_wpm)))
+        painter.drawText(QRectF(0, plot.bottom() - 10, margin - 5, 20),
+                         Qt.AlignmentFlag.AlignRight, "0")
+        painter.drawText(QRectF(plot.left(), 0, 200, margin / 2),
+                         Qt.AlignmentFlag.AlignVCenter, "wpm")
+        painter.setPen(accuracy_color)
+        painter.drawText(QRectF(plot.right() + 5, plot.top() - 10, margin,
+                                20), Qt.AlignmentFlag.AlignLeft, "100%")
+        painter.drawText(QRectF(plot.right() - 200, 0, 200, margin / 2),
+                         Qt.AlignmentFlag.AlignRight
+                         | Qt.AlignmentFlag.AlignVCenter, "accuracy")
+        painter.setPen(Qt.GlobalColor.black)
+        painter.drawText(QRectF(plot.left(), plot.bottom(), plot.width(),
+                                margin), Qt.AlignmentFlag.AlignCenter,
+                         "attempts " + str(start + 1) + " - " + str(end))
+
+    @staticmethod
+    def draw_line(painter: QPainter, plot: QRectF, x: np.ndarray,
+                  y: np.ndarray, start: int, end: int,
+                  color: QColor) -> None:
+        """ Draws the line, x from start to end and y from 0 to 1
+    are stretched over the plot """
+        width = max(end - 1 - start, 1)
+        left = plot.left() + (x - start) / width * plot.width()
+        top = plot.bottom() - np.clip(y, 0, 1) * plot.height()
+        points = [QPointF(point_x, point_y) for point_x, point_y
+                  in zip(left.tolist(), top.tolist())]
+        painter.setPen(QPen(color, 2))
+        # separate segments, a wide polyline is stroked with joins
+        # about 50 times slower
+        painter.drawLines([QLineF(points[index], points[index + 1])
+                           for index in range(len(points) - 1)])
@@ -0,0 +1,72 @@
+import time
+from src.globals import text_reserve, text_history
+from src.keystroke_log import KeystrokeLog
+from src.key_stats import KeyStats
+
+
+class TypingSession:
+    """ Target text of an attempt and the position of the user in it.
+    The text is held once, a correct keystroke only moves the cursor """
+
+    def __init__(self, source, reserve: int = text_reserve,
+                 history: int = text_history,
+                 log: KeystrokeLog = None) -> None:
+        self.source = source # iterator of text chunks
+        self.log = log if log is not None else KeystrokeLog()
+        self.key_stats = KeyStats()
+        self.last_press = None # time of the previous keystroke, ns
+        self.reserve = reserve
+        self.history = history
+        self.text = ''
+        self.cursor = 0
+        self.count_signs = 0
+        self.mistakes = 0
+        self.is_mistake = False
+
+    def remaining_len(self) -> int:
+        """ Returns the number of characters left to type """
+        return len(self.text) - self.cursor
+
+    def fill(self) -> None:
+        """ Drops the typed text that is no longer displayed and tops
+    the upcoming text up from the source, so the text stays the same
+    size however long the attempt is """
+        if self.cursor > self.history:
+            self.text = self.text[self.cursor - self.history:]
+            self.cursor = self.history
+        while self.remaining_len() < self.reserve:
+            self.text += next(self.source)
+
+    def press(self, char: str, time_ns: int = None) -> bool:
+        """ Checks the typed character, logs and counts it and moves on
+    if it is correct. 'е' is accepted in place of 'ё' """
+        if time_ns is None:
+            time_ns = time.perf_counter_ns()
+        expected = self.text[self.cursor]
+        is_correct = char == expected or (char == 'е' and expected == 'ё')
+        self.log.record(time_ns, ord(expected), ord(char[0]) if char else 0,
+                        is_correct)
+        self.key_stats.record(
+            self.text[self.cursor - 1] if self.cursor else '', expected,
+            is_correct, -1 if self.last_press is None
+            else (time_ns - self.last_press) // 1000)
+        self.last_press = time_ns
+        if not is_correct:
+            if not self.is_mistake:
+                self.mistakes += 1
+            self.is_mistake = True
+            return False
+        self.is_mistake = False
+        self.count_signs += 1
+        self.cursor += 1
+        if self.remaining_len() < self.reserve:
+            self.fill()
+        return True
+
+    def typed(self, size: int = text_history) -> str:
+        """ Returns the last typed characters """
+        return self.text[max(self.cursor - size, 0):self.cursor]
+
+    def upcoming(self, size: int = text_reserve) -> str:
+        """ Returns the next characters to type """
+        return self.text[self.cursor:self.cursor + size]
@@ -0,0 +1,44 @@
+import os
+import sys
+
+# the tests drive the real window without a display, from the repository
+# root where the paths of src/globals.py point
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+os.chdir(root)
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+import src.history_store as history_store
+import src.main_window as main_window
+from src.text_generating import load_corpus
+
+
+@pytest.fixture(scope='session')
+def app() -> QApplication:
+    """ The application of all the tests, Qt allows only one """
+    application = QApplication.instance() or QApplication([])
+    load_corpus()
+    return application
+
+
+@pytest.fixture
+def window(app, tmp_path, monkeypatch) -> main_window.MainWindow:
+    """ A shown main window saving its history and latency files
+    into a temporary directory instead of src/ """
+    monkeypatch.setattr(main_window, 'history_file',
+                        str(tmp_path / 'history.db'))
+    monkeypatch.setattr(main_window, 'latency_file',
+                        str(tmp_path / 'latency.txt'))
+    monkeypatch.setattr(history_store, 'legacy_attempts_log',
+                        str(tmp_path / 'attempts.bin'))
+    monkeypatch.setattr(history_store, 'legacy_attempts_file',
+                        str(tmp_path / 'attempts.txt'))
+    shown = main_window.MainWindow()
+    shown.show()
+    app.processEvents()
+    yield shown
+    shown.close()
+    app.processEvents()
@@ -0,0 +1,43 @@
+from PyQt6.QtCore import Qt, QEvent, QEventLoop, QTimer
+from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtWidgets import QApplication, QPushButton, QWidget
+
+
+def spin(msecs: int) -> None:
+    """ Runs the event loop for the given time """
+    loop = QEventLoop()
+    QTimer.singleShot(msecs, loop.quit)
+    loop.exec()
+
+
+def press(widget: QWidget, text: str, key: int = 0) -> None:
+    """ Sends the key press to the widget through the event system,
+    so that event filters see it too """
+    QApplication.sendEvent(widget, QKeyEvent(
+        QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, text))
+
+
+def press_enter(widget: QWidget) -> None:
+    """ Sends the Enter key press to the widget """
+    press(widget, '\r', Qt.Key.Key_Return.value)
+
+
+def type_correct(window, count: int) -> None:
+    """ Types the next characters of the attempt text """
+    for _ in range(count):
+        press(window, window.session.text[window.session.cursor])
+
+
+def finish_countdown(window) -> None:
+    """ Fires the ticks of the countdown at once """
+    window.scheduler.countdown_timer.stop()
+    while not window.is_launched:
+        window.scheduler.update_countdown()
+
+
+def page_button(window, page: str, title: str) -> QPushButton:
+    """ Returns the button of the page with the title """
+    for button in window.pages[page].findChildren(QPushButton):
+        if button.text() == title:
+            return button
+    raise LookupError(title)
@@ -0,0 +1,35 @@
+import time
+from PyQt6.QtCore import QEventLoop, QTimer
+from helpers import finish_countdown
+
+time_limit = 2 # seconds of the attempt
+stall = 0.05 # seconds the event loop is blocked at a time
+stall_interval = 70 # milliseconds between the stalls
+tolerance = 30 # milliseconds between the measured and wall-clock time
+
+
+def test_measured_time_matches_wall_clock_under_stalls(window):
+    started = []
+    ended = []
+    loop = QEventLoop()
+    window.scheduler.started.connect(
+        lambda: started.append(time.perf_counter()))
+    window.scheduler.deadline.connect(
+        lambda: ended.append(time.perf_counter()) or loop.quit())
+    staller = QTimer()
+    staller.timeout.connect(lambda: time.sleep(stall))
+    staller.start(stall_interval)
+    QTimer.singleShot(10 * time_limit * 1000, loop.quit)
+
+    window.set_mode(window.switch_to_mode, time_limit)()
+    finish_countdown(window)
+    loop.exec()
+    staller.stop()
+
+    assert started and ended, "the attempt did not reach its deadline"
+    wall = (ended[0] - started[0]) * 1000
+    measured = window.scheduler.elapsed_msecs()
+    assert measured >= time_limit * 1000
+    assert abs(measured - wall) <= tolerance
+    # a late deadline is at most one stall late
+    assert wall <= time_limit * 1000 + stall * 1000 + tolerance
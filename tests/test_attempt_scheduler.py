@@ -0,0 +1,19 @@
+from PyQt6.QtCore import QTimer
+from helpers import finish_countdown, page_button, press_enter, type_correct
+
+cycles = 1000
+
+
+def test_pause_and_resume_create_no_timers(app, window):
+    window.button15.click()
+    finish_countdown(window)
+    timers = len(window.findChildren(QTimer))
+    for _ in range(cycles):
+        type_correct(window, 2)
+        press_enter(window)
+        assert not window.is_launched
+        page_button(window, 'pause', "continue").click()
+        finish_countdown(window)
+        app.processEvents()
+    assert window.is_launched
+    assert len(window.findChildren(QTimer)) == timers
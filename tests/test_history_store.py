@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+import pytest
+import src.history_store as history_store
+from src.history_store import HistoryStore
+from src.key_stats import KeyStats
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch) -> str:
+    """ Path of a new history database, with no legacy files to import """
+    monkeypatch.setattr(history_store, 'legacy_attempts_log',
+                        str(tmp_path / 'attempts.bin'))
+    monkeypatch.setattr(history_store, 'legacy_attempts_file',
+                        str(tmp_path / 'attempts.txt'))
+    return str(tmp_path / 'history.db')
+
+
+def lock(path: str) -> sqlite3.Connection:
+    """ Returns a connection holding the write lock of the database """
+    connection = sqlite3.connect(path, isolation_level=None,
+                                 check_same_thread=False)
+    connection.execute("BEGIN EXCLUSIVE")
+    return connection
+
+
+def saved_attempts(path: str) -> int:
+    connection = sqlite3.connect(path)
+    count = connection.execute("SELECT COUNT(*) FROM attempts").fetchone()[0]
+    connection.close()
+    return count
+
+
+def test_close_waits_for_a_busy_database(path, monkeypatch):
+    monkeypatch.setattr(history_store, 'history_busy_timeout', 0.2)
+    store = HistoryStore(path)
+    locker = lock(path)
+    store.add_attempt('time', 15, None, 40.0, 95.0, 2)
+    # released after a few busy timeouts, before the retries run out
+    threading.Timer(0.3, locker.rollback).start()
+    store.close()
+    locker.close()
+    assert saved_attempts(path) == 1
+
+
+def test_close_raises_when_the_last_batch_is_not_saved(path, monkeypatch):
+    monkeypatch.setattr(history_store, 'history_busy_timeout', 0.05)
+    store = HistoryStore(path)
+    locker = lock(path)
+    store.add_attempt('time', 15, None, 40.0, 95.0, 2)
+    with pytest.raises(sqlite3.OperationalError):
+        store.close()
+    locker.rollback()
+    locker.close()
+    assert saved_attempts(path) == 0
+
+
+def test_key_stats_of_a_batch_are_saved(path):
+    store = HistoryStore(path)
+    for char in 'абв':
+        key_stats = KeyStats()
+        key_stats.record(char, ' ', True, 0)
+        store.add_attempt('time', 15, None, 40.0, 95.0, 0,
+                          key_stats=key_stats)
+    expected = store.key_stats.to_bytes()
+    store.close()
+    store = HistoryStore(path)
+    assert store.key_stats.to_bytes() == expected
+    store.close()
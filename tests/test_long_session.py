@@ -0,0 +1,68 @@
+import gc
+import time
+import tracemalloc
+from PyQt6.QtCore import QObject
+from helpers import finish_countdown, page_button, press_enter, type_correct
+
+warm_up_cycles = 50 # every page is built and every cache filled
+cycles = 2000
+keys = 20 # typed in every part of an attempt
+memory_growth = 256 * 1024 # bytes the traced memory may grow by
+
+
+def end_attempt(window) -> None:
+    """ Runs the attempt out, as its deadline would. The attempt lasts
+    a millisecond at least, the speed is counted per minute """
+    time.sleep(0.001)
+    window.scheduler.deadline_timer.stop()
+    window.scheduler.reach_deadline()
+
+
+def cycle(app, window) -> None:
+    """ Menu, a 15 sec attempt, results, restart, pause and continue,
+    results, menu, statistics and back to the menu """
+    window.button15.click()
+    finish_countdown(window)
+    type_correct(window, keys)
+    end_attempt(window)
+    page_button(window, 'results', "restart").click()
+    finish_countdown(window)
+    type_correct(window, keys)
+    press_enter(window)
+    page_button(window, 'pause', "continue").click()
+    finish_countdown(window)
+    type_correct(window, keys)
+    end_attempt(window)
+    page_button(window, 'results', "menu").click()
+    window.button_stat.click()
+    page_button(window, 'stat', "menu").click()
+    app.processEvents()
+
+
+def traced_memory(window) -> int:
+    """ Returns the traced memory once the batch of attempts the history
+    writer may still hold is saved """
+    window.history.flush()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def test_long_session_stays_bounded(app, window):
+    for _ in range(warm_up_cycles):
+        cycle(app, window)
+    objects = len(window.findChildren(QObject))
+    tracemalloc.start()
+    try:
+        for _ in range(warm_up_cycles):
+            cycle(app, window)
+        start = traced_memory(window)
+        for _ in range(cycles):
+            cycle(app, window)
+            assert len(window.findChildren(QObject)) == objects
+        end = traced_memory(window)
+    finally:
+        tracemalloc.stop()
+    assert window.history.attempts_count() == 2 * (2 * warm_up_cycles
+                                                   + cycles)
+    assert end - start <= memory_growth, \
+        "traced memory grew by " + str(end - start) + " bytes"
@@ -0,0 +1,52 @@
+from helpers import page_button, spin
+
+
+def add_attempts(window, count: int) -> None:
+    for number in range(count):
+        window.history.add_attempt('time', 15, None, 40.0 + number % 9,
+                                   95.0, 1)
+
+
+def test_chart_view_is_kept_across_pages(app, window):
+    add_attempts(window, 30)
+    window.button_stat.click()
+    window.button_chart.click()
+    assert window.trend_chart.isVisible()
+    page_button(window, 'stat', "keys").click()
+    page_button(window, 'keys', "statistics").click()
+    assert window.trend_chart.isVisible()
+    assert not window.table_history.isVisible()
+    assert window.button_chart.isChecked()
+    window.button_chart.click()
+    assert window.table_history.isVisible()
+    assert not window.trend_chart.isVisible()
+
+
+def test_chart_reads_the_history_in_chunks(app, window, monkeypatch):
+    monkeypatch.setattr('src.trend_chart.chart_chunk', 7)
+    add_attempts(window, 30)
+    window.button_stat.click()
+    window.button_chart.click()
+    assert window.trend_chart.is_loading
+    assert len(window.trend_chart.wpm) == 7
+    while window.trend_chart.is_loading:
+        spin(1)
+    assert len(window.trend_chart.wpm) == 30
+    add_attempts(window, 5)
+    window.trend_chart.refresh()
+    while window.trend_chart.is_loading:
+        spin(1)
+    assert len(window.trend_chart.wpm) == 35
+
+
+def test_closing_stops_the_chart_reading(app, window, monkeypatch):
+    monkeypatch.setattr('src.trend_chart.chart_chunk', 3)
+    add_attempts(window, 300)
+    window.button_stat.click()
+    window.button_chart.click()
+    assert window.trend_chart.is_loading
+    window.close()
+    # a chunk read after the store is closed would abort the process
+    spin(100)
+    assert not window.trend_chart.is_loading
+    assert len(window.trend_chart.wpm) < 300